@@ -0,0 +1,195 @@
+# Replay archive: every recorded game as a fixed-size record, read back
+# through mmap as NumPy arrays so millions of games can be queried without
+# turning them into Python objects.
+#
+# Layout (little-endian), in two files that only ever grow at the end:
+#   FILE        64-byte header (see HEADER), then one RECORD per game
+#   FILE.flaps  uint32 flap frames of every game, back to back;
+#               flap_start/flap_count in a record index into it
+#
+# The header's counts are the commit point. Appending writes the new flaps
+# and records past the committed ends and syncs them, and only then rewrites
+# the header, which is a single 64-byte write. A crash at any point leaves the
+# header describing complete data; whatever is past the counts is ignored and
+# cut off by the next append. Appends cost only the new games.
+import argparse
+import mmap
+import os
+
+import numpy as np
+
+from replay import Replay, play
+
+MAGIC = b"FBARCH01"
+
+HEADER = np.dtype([
+    ("magic", "S8"),
+    ("record_count", "<u8"),
+    ("records_offset", "<u8"),
+    ("flap_count", "<u8"),
+    ("reserved", "<u8", 4),
+])
+
+RECORD = np.dtype([
+    ("seed", "<u8"),
+    ("flap_start", "<u8"),
+    ("flap_count", "<u4"),
+    ("score", "<u4"),
+    ("death_frame", "<u4"),
+    ("reserved", "<u4"),
+])
+
+FLAP = np.dtype("<u4")
+
+def flaps_path(path):
+    return path + ".flaps"
+
+def read_header(file):
+    file.seek(0)
+    header = np.frombuffer(file.read(HEADER.itemsize), HEADER).copy()[0]
+    if header["magic"] != MAGIC:
+        raise ValueError("not a Flappy Bird replay archive")
+    return header
+
+def write_synced(file, data):
+    file.write(data)
+    file.flush()
+    os.fsync(file.fileno())
+
+# Append replays to an archive, creating it if needed
+def append(path, replays):
+    replays = list(replays)
+    if not os.path.exists(path):
+        with open(path, "wb") as file:
+            header = np.zeros(1, HEADER)
+            header["magic"] = MAGIC
+            header["records_offset"] = HEADER.itemsize
+            write_synced(file, header.tobytes())
+
+    with open(path, "r+b") as file, open(flaps_path(path), "ab+") as flaps_file:
+        header = read_header(file)
+        record_count = int(header["record_count"])
+        flap_count = int(header["flap_count"])
+
+        new = np.zeros(len(replays), RECORD)
+        flaps = []
+        for i, replay in enumerate(replays):
+            new[i] = (replay.seed, flap_count + len(flaps), len(replay.flaps), replay.score, replay.frames, 0)
+            flaps.extend(replay.flaps)
+
+        # Drop anything an interrupted append left past the committed ends
+        flaps_file.truncate(flap_count * FLAP.itemsize)
+        write_synced(flaps_file, np.asarray(flaps, FLAP).tobytes())
+        file.truncate(HEADER.itemsize + record_count * RECORD.itemsize)
+        file.seek(0, os.SEEK_END)
+        write_synced(file, new.tobytes())
+
+        header["record_count"] = record_count + len(new)
+        header["flap_count"] = flap_count + len(flaps)
+        file.seek(0)
+        write_synced(file, header.tobytes())
+
+# Read-only view of an archive. records and flaps are NumPy arrays backed
+# directly by the mapped file.
+class Archive:
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        header = read_header(self.file)
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.records = np.frombuffer(self.map, RECORD, int(header["record_count"]), int(header["records_offset"]))
+        self.flaps_file = self.flaps_map = None
+        flap_count = int(header["flap_count"])
+        if flap_count:
+            self.flaps_file = open(flaps_path(path), "rb")
+            self.flaps_map = mmap.mmap(self.flaps_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.flaps = np.frombuffer(self.flaps_map, FLAP, flap_count)
+        else:
+            self.flaps = np.zeros(0, FLAP)  # mmap can't map an empty file
+
+    def __len__(self):
+        return len(self.records)
+
+    def close(self):
+        # Arrays must let go of the buffer before the map can close
+        self.records = self.flaps = None
+        self.map.close()
+        self.file.close()
+        if self.flaps_map:
+            self.flaps_map.close()
+            self.flaps_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def replay(self, i):
+        record = self.records[i]
+        start = int(record["flap_start"])
+        flaps = self.flaps[start:start + int(record["flap_count"])].tolist()
+        return Replay(int(record["seed"]), flaps, int(record["score"]), int(record["death_frame"]))
+
+    # Re-simulate record i with the sim.py rules
+    def resimulate(self, i):
+        return play(self.replay(i))
+
+    # Bulk queries, all straight off the mapped arrays
+    def score_counts(self):
+        return np.bincount(self.records["score"])
+
+    def score_percentiles(self, q=(50, 90, 99, 99.9)):
+        return np.percentile(self.records["score"], q)
+
+    def death_frame_histogram(self, bins=20):
+        return np.histogram(self.records["death_frame"], bins)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flappy Bird replay archive")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="append .fbr replay files to an archive")
+    add.add_argument("archive")
+    add.add_argument("paths", nargs="+", help="replay files or directories of them")
+    stats = commands.add_parser("stats", help="score and death-frame distribution")
+    stats.add_argument("archive")
+    verify = commands.add_parser("verify", help="re-simulate records and check their results")
+    verify.add_argument("archive")
+    verify.add_argument("--sample", type=int, default=1_000, help="records to check, picked at random (0 = all)")
+    args = parser.parse_args()
+
+    if args.command == "add":
+        paths = []
+        for path in args.paths:
+            if os.path.isdir(path):
+                paths.extend(os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".fbr"))
+            else:
+                paths.append(path)
+        append(args.archive, (Replay.load(path) for path in paths))
+        print(f"added {len(paths)} replays to {args.archive}")
+
+    elif args.command == "stats":
+        with Archive(args.archive) as archive:
+            print(f"{len(archive)} games, {len(archive.flaps)} flaps")
+            if len(archive):
+                percentiles = archive.score_percentiles()
+                print("score p50/p90/p99/p99.9: " + " / ".join(f"{p:g}" for p in percentiles))
+                counts, edges = archive.death_frame_histogram()
+                peak = counts.max()
+                for count, edge in zip(counts, edges):
+                    print(f"  frame {edge:>9.0f}  {count:>9}  {'#' * int(40 * count / peak)}")
+
+    elif args.command == "verify":
+        with Archive(args.archive) as archive:
+            count = len(archive)
+            indices = range(count) if not args.sample or args.sample >= count else \
+                np.random.default_rng().choice(count, args.sample, replace=False)
+            failed = 0
+            for i in indices:
+                replay = archive.replay(i)
+                state = play(replay)
+                if state.score != replay.score or state.frame != replay.frames:
+                    failed += 1
+                    print(f"record {i}: seed {replay.seed} replays to score {state.score} frame {state.frame}, "
+                          f"archived {replay.score} / {replay.frames}")
+            print(f"checked {len(indices)} records, {failed} mismatches")
+        raise SystemExit(1 if failed else 0)
@@ -0,0 +1,249 @@
+# Autopilot: plans flaps through the upcoming pylons with a depth-first
+# search over exact bird states (y, jumpSpeed, isJumping at a given frame),
+# stepped with sim.Bird itself so the plan can't drift from the real rules.
+#
+# The search is never restarted. Its stack is the plan: the first entry is
+# the bird now, and each entry holds the move to the next one and the moves
+# not tried yet. Every frame the search gets a fixed budget to push the plan
+# out towards the horizon, backing out of dead ends as it goes; then the bird
+# takes the first move and that entry drops off the front. A hard stretch is
+# met at the horizon, with the horizon's worth of frames left to work it out.
+#
+# States from which every move crashes go into a transposition table for the
+# rest of the game. That stays true whatever pylons are placed later, so the
+# search never explores them twice. States that can't get into a gap ahead
+# in time are cut straight away: the bird sinks at most as fast as it does
+# without flapping, and climbs at most as fast as flapping every frame.
+import argparse
+import random
+import time
+
+import collision
+import sim
+
+HORIZON = 150  # Frames planned ahead, enough to see past the next gap
+BUDGET = 30  # Search states per frame
+MARGIN = 5  # How far above a gap's bottom edge the search first tries to keep the bird
+MAX_DEAD = 500_000  # Transposition table entries before it is cleared
+
+# Plan entries: [frame, y, jumpSpeed, isJumping, moves not tried yet, move taken]
+FRAME, Y, JUMP_SPEED, JUMPING, UNTRIED, MOVE = range(6)
+
+class Autopilot:
+    def __init__(self, horizon=HORIZON, budget=BUDGET):
+        self.horizon = horizon
+        self.budget = budget
+        self.bird = sim.Bird()  # Scratch bird for stepping the rules
+        self.moves = {}  # (jumpSpeed, isJumping, flap) -> (dy, jumpSpeed, isJumping)
+        self.dead = set()
+        self.plan = []
+        self.seed = None
+        self.pylons = {}  # Every pylon seen: (x at frame 0, y, gap, speed, width, height)
+        self.speed = None  # Scroll speed the pylons and the table were worked out for
+        self.gaps = []  # (first frame the bird is inside the pylon, top, bottom) for each pylon
+        self.falls = {}  # (jumpSpeed, frames) -> how far the bird sinks without flapping
+        self.climb = -self.advance(0, 0, False, True)[0]  # How far one frame of flapping lifts the bird
+        self.nodes = 0
+
+    # Policy interface: flap or not on this frame
+    def __call__(self, state):
+        if state.seed != self.seed or state.frame == 0:
+            self.seed = state.seed
+            self.dead.clear()
+            self.pylons.clear()
+            self.plan = []
+        if self.see_pylons(state):
+            self.check_plan()
+
+        bird = state.bird
+        current = [state.frame, bird.y, bird.jumpSpeed, bird.isJumping]
+        if not self.plan or self.plan[0][:UNTRIED] != current:
+            self.plan = [self.entry(*current)]
+        self.extend(state.frame + self.horizon)
+
+        if len(self.plan) < 2:
+            self.plan = []
+            return sim.follow_gap(state)  # Every move crashes, nothing to plan
+        return self.plan.pop(0)[MOVE]
+
+    # Push the plan out towards the horizon, within the frame's budget
+    def extend(self, horizon):
+        plan = self.plan
+        budget = self.budget
+        while plan and plan[-1][FRAME] < horizon and budget:
+            last = plan[-1]
+            if not last[UNTRIED]:
+                # Every move from here crashes: remember that and back up
+                self.dead.add(tuple(last[:UNTRIED]))
+                plan.pop()
+                continue
+            move, (y, jump_speed, jumping) = last[UNTRIED].pop(0)
+            frame = last[FRAME] + 1
+            if (frame, y, jump_speed, jumping) in self.dead or self.hits(frame, last[Y], y):
+                continue
+            if not self.reaches(frame, y, jump_speed, jumping):
+                continue
+            last[MOVE] = move
+            plan.append(self.entry(frame, y, jump_speed, jumping))
+            budget -= 1
+            self.nodes += 1
+        if len(self.dead) > MAX_DEAD:
+            self.dead.clear()
+
+    # New plan entry; the move that keeps the bird low in the next gap is tried first
+    def entry(self, frame, y, jump_speed, jumping):
+        fall = self.advance(y, jump_speed, jumping, False)
+        untried = [(False, fall)]
+        flap = self.advance(y, jump_speed, jumping, True)
+        if flap != fall:
+            if y > self.target_y(frame):
+                untried.insert(0, (True, flap))
+            else:
+                untried.append((True, flap))
+        return [frame, y, jump_speed, jumping, untried, None]
+
+    # Bird.update doesn't depend on y, so each move is worked out once with
+    # the scratch bird and then only looked up
+    def advance(self, y, jump_speed, jumping, flap):
+        move = self.moves.get((jump_speed, jumping, flap))
+        if move is None:
+            bird = self.bird
+            bird.y = 0
+            bird.jumpSpeed = jump_speed
+            bird.isJumping = jumping
+            if flap:
+                bird.jump()
+            bird.update()
+            move = self.moves[jump_speed, jumping, flap] = (bird.y, bird.jumpSpeed, bird.isJumping)
+        dy, jump_speed, jumping = move
+        return y + dy, jump_speed, jumping
+
+    # Can the bird still be between the edges of every gap ahead when it gets there?
+    def reaches(self, frame, y, jump_speed, jumping):
+        for enter, top, bottom in self.gaps:
+            frames = enter - frame
+            if frames <= 0:
+                continue
+            if y + self.fall(jump_speed, jumping, frames) < top or y - self.climb * frames > bottom:
+                return False
+        return True
+
+    def fall(self, jump_speed, jumping, frames):
+        if not jumping:
+            return self.bird.gravity * frames
+        drop = self.falls.get((jump_speed, frames))
+        if drop is None:
+            drop, speed = 0, jump_speed
+            for left in range(frames, 0, -1):
+                if not jumping:
+                    drop += self.bird.gravity * left
+                    break
+                drop, speed, jumping = self.advance(drop, speed, jumping, False)
+            self.falls[jump_speed, frames] = drop
+        return drop
+
+    # Note pylons placed since the last frame; True if there were any
+    def see_pylons(self, state):
+        speed = state.pylons[0].speed
+        if speed != self.speed:
+            # Levels speed all pylons up at once; what was worked out for the old speed is wrong now
+            self.speed = speed
+            self.dead.clear()
+            self.pylons.clear()
+            self.plan = []
+        added = False
+        for p in state.pylons:
+            key = (p.x + p.speed * state.frame, p.y, p.gap, p.speed, p.width, p.height)
+            if key not in self.pylons:
+                self.pylons[key] = None
+                added = True
+        if added:
+            # Forget the ones behind the bird, the plan never goes back in time
+            r = self.bird.radius
+            for key in [key for key in self.pylons if key[0] - key[3] * state.frame + key[4] <= self.bird.x - r]:
+                del self.pylons[key]
+            # A pixel of slack either side: the bound only has to be safe, not tight
+            self.gaps = [(-((self.bird.x - x) // speed), py + height + r - 1, py + height + gap - r + 1)
+                         for x, py, gap, speed, width, height in self.pylons]
+        return added
+
+    # Cut the plan where it runs into a newly placed pylon
+    def check_plan(self):
+        plan = self.plan
+        for i in range(1, len(plan)):
+            if self.hits(plan[i][FRAME], plan[i - 1][Y], plan[i][Y]):
+                del plan[i:]
+                return
+
+    # Swept test of the bird's move into `frame` against every pylon in reach
+    def hits(self, frame, prev_y, y):
+        bird = self.bird
+        r = bird.radius
+        for x, py, gap, speed, width, height in self.pylons:
+            x1 = bird.x - (x - speed * frame)
+            x0 = x1 - speed
+            if x1 <= -r or x0 >= width + r:
+                continue
+            top = py + height
+            bottom = top + gap
+            if min(prev_y, y) >= top + r and max(prev_y, y) <= bottom - r:
+                continue
+            if collision.swept_circle_box(x0, prev_y, x1, y, r, 0, -collision.INF, width, top):
+                return True
+            if collision.swept_circle_box(x0, prev_y, x1, y, r, 0, bottom, width, collision.INF):
+                return True
+        return False
+
+    # Just above the bottom edge of the first gap still ahead at `frame`.
+    # Falling is slow and climbing fast, so a bird kept low is never far above
+    # where it needs to be.
+    def target_y(self, frame):
+        bird = self.bird
+        nearest = None
+        target = sim.SCREEN_HEIGHT // 2
+        for x, py, gap, speed, width, height in self.pylons:
+            x = x - speed * frame
+            if x + width > bird.x - bird.radius and (nearest is None or x < nearest):
+                nearest = x
+                target = py + height + gap - bird.radius - MARGIN
+        return target
+
+# Level check: let the autopilot play each game; a crash means no flap
+# sequence it could find gets through that stretch of the level
+def validate(games, frames, seed=0, level=None, horizon=HORIZON, budget=BUDGET):
+    seeds = random.Random(seed)
+    results = []
+    times = []
+    for _ in range(games):
+        state = sim.new_game(seeds.randrange(2**32), level)
+        pilot = Autopilot(horizon, budget)
+        while not state.game_over and state.frame < frames:
+            start = time.perf_counter()
+            flap = pilot(state)
+            times.append(time.perf_counter() - start)
+            sim.step(state, flap)
+        results.append((state.seed, state.score, state.frame, state.game_over))
+    times.sort()
+    return results, sum(times) / len(times) * 1000, times[int(len(times) * 0.999)] * 1000, times[-1] * 1000
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play games with the autopilot and report any it can't finish")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=5_000, help="a game that lasts this long counts as cleared")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--difficulty", type=float, default=None,
+                        help="check level.CurveLevel games starting at this difficulty instead of the classic game")
+    parser.add_argument("--horizon", type=int, default=HORIZON)
+    parser.add_argument("--budget", type=int, default=BUDGET, help="search states per frame; more finds paths a short budget misses")
+    args = parser.parse_args()
+
+    level = None
+    if args.difficulty is not None:
+        from level import CurveLevel  # Needs NumPy
+        level = CurveLevel(args.difficulty)
+    results, mean_ms, slow_ms, worst_ms = validate(args.games, args.frames, args.seed, level, args.horizon, args.budget)
+    crashed = [result for result in results if result[3]]
+    print(f"{len(results) - len(crashed)} of {len(results)} games cleared {args.frames} frames")
+    for seed, score, frame, _ in crashed:
+        print(f"  seed {seed}: crashed at frame {frame} with score {score}")
+    print(f"decision time: mean {mean_ms:.3f} ms, 99.9th percentile {slow_ms:.3f} ms, worst {worst_ms:.2f} ms")
@@ -0,0 +1,277 @@
+# NumPy batch simulator: N independent games of the sim.py rules per call.
+# State is kept as struct-of-arrays, one row (or element) per game.
+import argparse
+import time
+
+import numpy as np
+
+import sim
+from sim import SCREEN_WIDTH, PYLON_START, SCORE, CRASH
+
+# Rule constants, read off a fresh sim.Bird / sim.Pylon so the two engines
+# can't drift apart
+BIRD = sim.Bird()
+PYLON = sim.Pylon()
+BIRD_X = BIRD.x
+BIRD_Y = BIRD.y  # Where every game starts
+BIRD_RADIUS = BIRD.radius
+GRAVITY = BIRD.gravity
+JUMP_SPEED = BIRD.jumpSpeed
+PYLON_WIDTH = PYLON.width
+PYLON_HEIGHT = PYLON.height
+PYLON_GAP = PYLON.gap
+PYLON_SPEED = PYLON.speed
+
+# Values of BatchSim.death
+ALIVE, TOP, BOTTOM = 0, 1, 2
+
+# Array versions of the collision.py tests
+
+# Parameter interval where p0 + d * t is strictly between a and b
+def slab(p0, d, a, b):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ta = (a - p0) / d
+        tb = (b - p0) / d
+    inside = (a < p0) & (p0 < b)
+    enter = np.where(d == 0, np.where(inside, -np.inf, np.inf), np.minimum(ta, tb))
+    leave = np.where(d == 0, np.where(inside, np.inf, -np.inf), np.maximum(ta, tb))
+    return enter, leave
+
+def segment_hits_box(x0, y0, x1, y1, left, top, right, bottom):
+    x_enter, x_exit = slab(x0, x1 - x0, left, right)
+    y_enter, y_exit = slab(y0, y1 - y0, top, bottom)
+    return np.maximum(np.maximum(x_enter, y_enter), 0.0) < np.minimum(np.minimum(x_exit, y_exit), 1.0)
+
+def segment_hits_circle(x0, y0, x1, y1, cx, cy, r):
+    dx = x1 - x0
+    dy = y1 - y0
+    fx = x0 - cx
+    fy = y0 - cy
+    a = dx * dx + dy * dy
+    b = 2 * (dx * fx + dy * fy)
+    c = fx * fx + fy * fy - r * r
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(a > 0, np.clip(-b / (2 * a), 0.0, 1.0), 0.0)
+    return a * t * t + b * t + c < 0
+
+def swept_circle_box(x0, y0, x1, y1, r, left, top, right, bottom):
+    x0, y0, x1, y1 = (np.asarray(v, float) for v in (x0, y0, x1, y1))
+    hit = segment_hits_box(x0, y0, x1, y1, left - r, top, right + r, bottom)
+    hit |= segment_hits_box(x0, y0, x1, y1, left, top - r, right, bottom + r)
+    for cy in (top, bottom):
+        if np.all(np.isfinite(cy)):
+            for cx in (left, right):
+                hit |= segment_hits_circle(x0, y0, x1, y1, cx, cy, r)
+    return hit
+
+# Column of the nearest pylon not yet behind the bird, per row
+def next_pylon(pylon_x):
+    ahead = pylon_x + PYLON_WIDTH > BIRD_X - BIRD_RADIUS
+    return np.argmin(np.where(ahead, pylon_x, np.iinfo(np.int32).max), axis=1)
+
+# Batch of Games
+# With level=None pylons follow the classic rules, with offsets drawn from a
+# NumPy generator. With a level.CurveLevel every game gets a seed and its
+# pylons come from the level's specs for that seed, the same as sim.py would
+# place them.
+class BatchSim:
+    def __init__(self, n, seed=None, level=None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        self.level = level
+        self.y = np.empty(n, np.int32)
+        self.jumpSpeed = np.empty(n, np.int32)
+        self.isJumping = np.empty(n, bool)
+        self.pylon_x = np.empty((n, len(PYLON_START)), np.int32)
+        self.pylon_y = np.empty((n, len(PYLON_START)), np.int32)
+        self.pylon_gap = np.empty((n, len(PYLON_START)), np.int32)
+        self.pylon_speed = np.empty((n, len(PYLON_START)), np.int32)
+        self.seed = np.zeros(n, np.uint64)  # Per game, for the level
+        self.spawned = np.zeros(n, np.int64)  # Pylons placed so far, for the level
+        self.reach_low = np.zeros(n, np.int64)  # Where the bird can pass the last pylon placed, for the level
+        self.reach_high = np.zeros(n, np.int64)
+        self.score = np.empty(n, np.int32)
+        self.frame = np.empty(n, np.int32)
+        self.game_over = np.empty(n, bool)
+        self.death = np.empty(n, np.int8)
+        self.next = np.empty(n, np.intp)
+        self.reset()
+
+    # Restart every game, or only the ones selected by a boolean mask
+    def reset(self, mask=None):
+        if mask is None:
+            mask = np.ones(self.n, bool)
+        count = int(mask.sum())
+        if count == 0:
+            return
+        self.y[mask] = BIRD_Y
+        self.jumpSpeed[mask] = JUMP_SPEED
+        self.isJumping[mask] = False
+        if self.level is None:
+            self.pylon_x[mask] = PYLON_START
+            self.pylon_y[mask] = self.rng.integers(-150, 151, (count, len(PYLON_START)))
+            self.pylon_gap[mask] = PYLON_GAP
+            self.pylon_speed[mask] = PYLON_SPEED
+        else:
+            seeds = self.rng.integers(0, 2**32, count, dtype=np.uint64)
+            self.seed[mask] = seeds
+            self.spawned[mask] = len(PYLON_START)
+            indices = np.arange(len(PYLON_START))
+            spacing, offset, gap, speed = self.level.specs(seeds[:, None], indices)
+            low = high = np.full(count, BIRD_Y)
+            for column in indices:
+                offset[:, column], low, high = self.level.within_reach(
+                    indices[column], spacing[:, column], offset[:, column], gap[:, column], low, high)
+            self.reach_low[mask] = low
+            self.reach_high[mask] = high
+            spacing[:, 0] = 0
+            self.pylon_x[mask] = PYLON_START[0] + np.cumsum(spacing, axis=1)
+            self.pylon_y[mask] = offset
+            self.pylon_gap[mask] = gap
+            self.pylon_speed[mask] = speed[:, -1:]  # One speed per game, the last pylon's
+        self.score[mask] = 0
+        self.frame[mask] = 0
+        self.game_over[mask] = False
+        self.death[mask] = ALIVE
+        self.next[mask] = 0
+
+    # Advance every live game by one frame; flap is a bool array of length n
+    def step(self, flap):
+        live = ~self.game_over
+
+        # Bird.jump
+        flap = np.asarray(flap, bool) & live
+        self.isJumping |= flap
+        self.jumpSpeed[flap] = JUMP_SPEED
+
+        # Bird.update
+        prev_y = self.y.copy()
+        jumping = self.isJumping & live
+        self.jumpSpeed -= jumping
+        self.y -= np.where(jumping, self.jumpSpeed, 0)
+        self.y += np.where(live & ~jumping, GRAVITY, 0)
+        self.isJumping &= ~(jumping & (self.jumpSpeed < -JUMP_SPEED))
+
+        # Pylon.update
+        rows = np.arange(self.n)
+        prev_x = self.pylon_x[rows, self.next]
+        self.pylon_x -= self.pylon_speed * live[:, None]
+        wrap = self.pylon_x < -PYLON_WIDTH
+        if wrap.any():
+            self.recycle(wrap)
+
+        # Collision and scoring against the next pylon only (collision.py rules)
+        x = self.pylon_x[rows, self.next]
+        top = self.pylon_y[rows, self.next] + PYLON_HEIGHT
+        gap = self.pylon_gap[rows, self.next]
+        x0 = BIRD_X - prev_x
+        x1 = BIRD_X - x
+        # Same cheap rejects as collision.pylon_hit, then the full test on what's left
+        near = live & (x1 > -BIRD_RADIUS) & (x0 < PYLON_WIDTH + BIRD_RADIUS)
+        near &= ~((np.minimum(prev_y, self.y) >= top + BIRD_RADIUS) & (np.maximum(prev_y, self.y) <= top + gap - BIRD_RADIUS))
+        crashed = np.zeros(self.n, bool)
+        if near.any():
+            args = (x0[near], prev_y[near], x1[near], self.y[near], BIRD_RADIUS)
+            hit_top = swept_circle_box(*args, 0, -np.inf, PYLON_WIDTH, top[near])
+            hit_bottom = swept_circle_box(*args, 0, top[near] + gap[near], PYLON_WIDTH, np.inf)
+            crashed[near] = hit_top | hit_bottom
+            self.death[near] = np.where(hit_top, TOP, np.where(hit_bottom, BOTTOM, ALIVE))
+
+        scored = (x <= BIRD_X) & (BIRD_X < prev_x) & live
+        self.score += scored
+
+        passed = x + PYLON_WIDTH <= BIRD_X - BIRD_RADIUS
+        if passed.any():
+            self.next[passed] = next_pylon(self.pylon_x[passed])
+
+        self.game_over |= crashed
+        self.frame += live
+        return np.where(scored, SCORE, 0) | np.where(crashed, CRASH, 0)
+
+    # Place pylons that scrolled off: classic ones at the right edge, level
+    # ones behind the pylon furthest right, column by column like sim.step
+    def recycle(self, wrap):
+        if self.level is None:
+            count = int(wrap.sum())
+            self.pylon_x[wrap] = SCREEN_WIDTH
+            self.pylon_y[wrap] = self.rng.integers(-150, 151, count)
+            return
+        for column in range(wrap.shape[1]):
+            rows = np.flatnonzero(wrap[:, column])
+            if not len(rows):
+                continue
+            spacing, offset, gap, speed = self.level.specs(self.seed[rows], self.spawned[rows])
+            offset, self.reach_low[rows], self.reach_high[rows] = self.level.within_reach(
+                self.spawned[rows], spacing, offset, gap, self.reach_low[rows], self.reach_high[rows])
+            others = np.delete(self.pylon_x[rows], column, axis=1)
+            self.pylon_x[rows, column] = others.max(axis=1) + spacing
+            self.pylon_y[rows, column] = offset
+            self.pylon_gap[rows, column] = gap
+            self.pylon_speed[rows] = speed[:, None]
+            self.spawned[rows] += 1
+
+    # Copy one game out into a sim.GameState (for drawing or debugging)
+    def game(self, i):
+        state = sim.new_game()
+        state.bird.y = int(self.y[i])
+        state.bird.jumpSpeed = int(self.jumpSpeed[i])
+        state.bird.isJumping = bool(self.isJumping[i])
+        for pylon, x, y, gap, speed in zip(state.pylons, self.pylon_x[i], self.pylon_y[i], self.pylon_gap[i], self.pylon_speed[i]):
+            pylon.place(int(x), int(y), int(gap), int(speed))
+        state.score = int(self.score[i])
+        state.frame = int(self.frame[i])
+        state.game_over = bool(self.game_over[i])
+        state.death = (None, "top", "bottom")[self.death[i]]
+        state.next_pylon = state.pylons[self.next[i]]
+        return state
+
+# Vectorized sim.follow_gap
+def follow_gap(batch):
+    rows = np.arange(batch.n)
+    target = batch.pylon_y[rows, batch.next] + PYLON_HEIGHT + batch.pylon_gap[rows, batch.next] // 2
+    return (batch.y > target + 20) & (~batch.isJumping | (batch.jumpSpeed < 0))
+
+# Run a batch with auto-restart and report throughput. mean_score only
+# averages games that ended; mean_score_all also counts the games the run cut
+# off, at their score so far, so long-lived games aren't left out.
+def run_batch(games, frames, seed=None, policy=follow_gap, level=None):
+    batch = BatchSim(games, seed, level)
+    finished = 0
+    total_score = 0
+    best = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        events = batch.step(policy(batch))
+        done = (events & CRASH) != 0
+        if done.any():
+            finished += int(done.sum())
+            total_score += int(batch.score[done].sum())
+            best = max(best, int(batch.score[done].max()))
+            batch.reset(done)
+    elapsed = time.perf_counter() - start
+    running = batch.frame > 0  # A game reset on the last frame hasn't started
+    played = finished + int(running.sum())
+    return {
+        "frames": games * frames,
+        "seconds": elapsed,
+        "fps": games * frames / elapsed if elapsed else float("inf"),
+        "games": finished,
+        "mean_score": total_score / finished if finished else 0.0,
+        "running": int(running.sum()),
+        "mean_score_all": (total_score + int(batch.score[running].sum())) / played if played else 0.0,
+        "best_score": max(best, int(batch.score.max())),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run many Flappy Bird games at once with NumPy")
+    parser.add_argument("--games", type=int, default=10_000)
+    parser.add_argument("--frames", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--difficulty", type=float, default=None,
+                        help="play level.CurveLevel games starting at this difficulty (0-1) instead of the classic game")
+    args = parser.parse_args()
+    level = None
+    if args.difficulty is not None:
+        from level import CurveLevel
+        level = CurveLevel(args.difficulty)
+    sim.print_report(run_batch(args.games, args.frames, args.seed, level=level))
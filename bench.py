@@ -0,0 +1,201 @@
+# Benchmark the g.py ... g8.py iterations: each one runs in its own process
+# under the SDL dummy video/audio drivers for a fixed number of frames of
+# scripted input, with the 60 fps clock replaced so only real work is timed.
+import argparse
+import json
+import os
+import runpy
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO = os.path.dirname(os.path.abspath(__file__))
+ITERATIONS = ["g.py", "g2.py", "g3.py", "g4.py", "g5.py", "g6.py", "g7.py", "g8.py"]
+
+# Scripted input, by frame number
+FLAP_EVERY = 12
+RESTART_EVERY = 30
+
+# Child process: run one iteration and print its numbers as JSON
+def run_iteration(script, frames, warmup, track_alloc):
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    import pygame
+
+    # Play in a scratch directory so the real high_score.txt is left alone
+    os.chdir(tempfile.mkdtemp())
+    with open("high_score.txt", "w") as file:
+        file.write("0")
+
+    # Virtual time: every tick is exactly one 60 Hz frame and never sleeps
+    perf_counter_ns = time.perf_counter_ns
+    ticks = [0]
+
+    class BenchClock:
+        def tick(self, framerate=0):
+            ticks[0] += 1
+            return 16
+
+        tick_busy_loop = tick
+
+        def get_time(self):
+            return 16
+
+        get_rawtime = get_time
+
+        def get_fps(self):
+            return 60.0
+
+    pygame.time.Clock = BenchClock
+    time.perf_counter = lambda: ticks[0] / 60
+
+    # Old iterations load sounds relative to wherever they were run from
+    Sound = pygame.mixer.Sound
+
+    def find_sound(file, *args, **kwargs):
+        if isinstance(file, str) and not os.path.exists(file):
+            file = os.path.join(REPO, os.path.basename(file))
+        return Sound(file, *args, **kwargs)
+
+    pygame.mixer.Sound = find_sound
+
+    frame_ends = []
+    allocations = []
+    frame = [0]
+    get_events = pygame.event.get
+
+    def scripted_events(*args, **kwargs):
+        events = list(get_events(*args, **kwargs))
+        if frame[0] % FLAP_EVERY == 0:
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+        if frame[0] % RESTART_EVERY == 0:
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_r))
+        if frame[0] >= warmup + frames:
+            events.append(pygame.event.Event(pygame.QUIT))
+        return events
+
+    # A wait with nothing scripted stands in for one frame of the player doing nothing
+    def scripted_wait(timeout=0):
+        events = scripted_events()
+        if not events:
+            frame[0] += 1
+            ticks[0] += 1
+            return pygame.event.Event(pygame.NOEVENT)
+        for event in events[1:]:
+            pygame.event.post(event)
+        return events[0]
+
+    pygame.event.get = scripted_events
+    pygame.event.wait = scripted_wait
+
+    update = pygame.display.update
+    flip = pygame.display.flip
+    frame_start_memory = [0]
+
+    def end_frame():
+        frame[0] += 1
+        frame_ends.append(perf_counter_ns())
+        if track_alloc:
+            current, peak = tracemalloc.get_traced_memory()
+            allocations.append(peak - frame_start_memory[0])
+            tracemalloc.reset_peak()
+            frame_start_memory[0] = current
+
+    def timed_update(*args):
+        result = update(*args)
+        end_frame()
+        return result
+
+    def timed_flip():
+        result = flip()
+        end_frame()
+        return result
+
+    pygame.display.update = timed_update
+    pygame.display.flip = timed_flip
+
+    sys.argv = [script]
+    sys.path.insert(0, REPO)
+    if track_alloc:
+        tracemalloc.start()
+    try:
+        runpy.run_path(os.path.join(REPO, script), run_name="__main__")
+    except SystemExit:
+        pass
+
+    times = sorted((b - a) / 1e6 for a, b in zip(frame_ends[warmup:], frame_ends[warmup + 1:]))
+    result = {"script": script, "frames": len(times)}
+    if track_alloc:
+        measured = allocations[warmup + 1:]
+        result["alloc_kib"] = sum(measured) / len(measured) / 1024 if measured else 0.0
+    elif times:
+        result["mean_ms"] = sum(times) / len(times)
+        result["p99_ms"] = times[min(len(times) - 1, int(len(times) * 0.99))]
+        result["max_ms"] = times[-1]
+    print(json.dumps(result))
+
+# Parent: run a script in a fresh interpreter and read back its JSON line
+def measure(script, frames, warmup, track_alloc=False):
+    command = [sys.executable, os.path.abspath(__file__), "--run", script,
+               "--frames", str(frames), "--warmup", str(warmup)]
+    if track_alloc:
+        command.append("--alloc")
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def benchmark(scripts, frames, warmup):
+    results = []
+    for script in scripts:
+        result = measure(script, frames, warmup)
+        result["alloc_kib"] = measure(script, frames, warmup, track_alloc=True)["alloc_kib"]
+        results.append(result)
+    return results
+
+# Compare each iteration to its baseline entry, or to the iteration before it
+def regressions(results, threshold, baseline=None):
+    failures = []
+    previous = None
+    for result in results:
+        reference = baseline.get(result["script"]) if baseline is not None else previous
+        if reference and result["mean_ms"] > reference["mean_ms"] * (1 + threshold):
+            failures.append((result["script"], reference["script"], result["mean_ms"] / reference["mean_ms"] - 1))
+        previous = result
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Frame-cost benchmark of the game iterations")
+    parser.add_argument("scripts", nargs="*", default=ITERATIONS)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--warmup", type=int, default=60)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="fail if mean frame time grows by more than this fraction")
+    parser.add_argument("--baseline", help="compare against a results file from --save instead of the previous iteration")
+    parser.add_argument("--save", help="write results to this file")
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    parser.add_argument("--alloc", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_iteration(args.run, args.frames, args.warmup, args.alloc)
+        sys.exit()
+
+    results = benchmark(args.scripts, args.frames, args.warmup)
+    print(f"{'script':<8} {'frames':>7} {'mean ms':>9} {'p99 ms':>9} {'max ms':>9} {'alloc KiB/frame':>16}")
+    for result in results:
+        print(f"{result['script']:<8} {result['frames']:>7} {result['mean_ms']:>9.3f} {result['p99_ms']:>9.3f} "
+              f"{result['max_ms']:>9.3f} {result['alloc_kib']:>16.1f}")
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = {result["script"]: result for result in json.load(file)}
+    failures = regressions(results, args.threshold, baseline)
+    for script, reference, growth in failures:
+        print(f"REGRESSION: {script} mean frame time is {growth:.0%} above {reference}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,73 @@
+# Collision and scoring for the bird against pylons.
+# Every test is swept over the whole frame: the bird's centre moves in a
+# straight line from last frame's position to this one while the pylon slides
+# left, so nothing can tunnel through a pylon however fast it scrolls.
+import math
+
+INF = math.inf
+
+# Parameter range t in [0, 1] where p0 + d * t is strictly between a and b
+def slab(p0, d, a, b):
+    if d == 0:
+        return (-INF, INF) if a < p0 < b else (INF, -INF)
+    ta = (a - p0) / d
+    tb = (b - p0) / d
+    return (ta, tb) if ta < tb else (tb, ta)
+
+# Does the segment (x0, y0) -> (x1, y1) pass through the inside of the box?
+def segment_hits_box(x0, y0, x1, y1, left, top, right, bottom):
+    x_enter, x_exit = slab(x0, x1 - x0, left, right)
+    y_enter, y_exit = slab(y0, y1 - y0, top, bottom)
+    return max(0.0, x_enter, y_enter) < min(1.0, x_exit, y_exit)
+
+# Does the segment come closer than r to the point (cx, cy)?
+def segment_hits_circle(x0, y0, x1, y1, cx, cy, r):
+    dx = x1 - x0
+    dy = y1 - y0
+    fx = x0 - cx
+    fy = y0 - cy
+    a = dx * dx + dy * dy
+    b = 2 * (dx * fx + dy * fy)
+    c = fx * fx + fy * fy - r * r
+    t = min(1.0, max(0.0, -b / (2 * a))) if a else 0.0
+    return a * t * t + b * t + c < 0
+
+# Swept circle against a box: the segment against the box grown by r,
+# which is two grown boxes plus a circle at each (finite) corner
+def swept_circle_box(x0, y0, x1, y1, r, left, top, right, bottom):
+    if segment_hits_box(x0, y0, x1, y1, left - r, top, right + r, bottom):
+        return True
+    if segment_hits_box(x0, y0, x1, y1, left, top - r, right, bottom + r):
+        return True
+    for cx in (left, right):
+        for cy in (top, bottom):
+            if math.isfinite(cy) and segment_hits_circle(x0, y0, x1, y1, cx, cy, r):
+                return True
+    return False
+
+# Which half of the pylon, if any, the bird hit between two frames.
+# Worked out relative to the pylon, so only the bird's path moves.
+def pylon_hit(pylon, prev_x, bird, prev_y):
+    x0 = bird.x - prev_x
+    x1 = bird.x - pylon.x
+    r = bird.radius
+    # Cheap rejects first: pylon out of reach, or bird clear of both edges of the gap
+    if max(x0, x1) <= -r or min(x0, x1) >= pylon.width + r:
+        return None
+    top = pylon.y + pylon.height
+    bottom = top + pylon.gap
+    if min(prev_y, bird.y) >= top + r and max(prev_y, bird.y) <= bottom - r:
+        return None
+    if swept_circle_box(x0, prev_y, x1, bird.y, r, 0, -INF, pylon.width, top):
+        return "top"
+    if swept_circle_box(x0, prev_y, x1, bird.y, r, 0, bottom, pylon.width, INF):
+        return "bottom"
+    return None
+
+# A point is scored when the pylon's front edge moves past the bird's centre
+def crossed(prev_x, pylon, bird):
+    return pylon.x <= bird.x < prev_x
+
+# Once a pylon is fully behind the bird it can't be hit any more
+def passed(pylon, bird):
+    return pylon.x + pylon.width <= bird.x - bird.radius
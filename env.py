@@ -0,0 +1,178 @@
+# Reinforcement-learning environments over the sim.py rules, with the
+# reset()/step() interface of Gymnasium (no dependency on it). No window and
+# no frame cap: a step is one 60 Hz frame of the game, run as fast as it goes.
+#
+# Observation (float32): bird y, bird velocity, then for the next two pylons
+# the distance to them, the height of their gap centre relative to the bird
+# and the size of the gap (levels make some gaps tighter than others).
+# Action: 0 = do nothing, 1 = flap.
+import argparse
+import random
+import time
+
+import numpy as np
+
+import batch
+import sim
+
+OBSERVATION_SIZE = 8
+ACTIONS = 2
+
+# Rewards
+SCORE_REWARD = 1.0
+CRASH_REWARD = -1.0
+
+# How far the bird moves next frame if it doesn't flap
+def velocity(bird):
+    return 1 - bird.jumpSpeed if bird.isJumping else bird.gravity
+
+# The next pylon and the one after it, in scroll order
+def next_two(state):
+    first = state.next_pylon
+    second = min((p for p in state.pylons if p.x > first.x), key=lambda p: p.x)
+    return first, second
+
+def observe(state, out=None):
+    bird = state.bird
+    if out is None:
+        out = np.empty(OBSERVATION_SIZE, np.float32)
+    out[0] = bird.y
+    out[1] = velocity(bird)
+    for i, pylon in enumerate(next_two(state)):
+        out[2 + 3 * i] = pylon.x - bird.x
+        out[3 + 3 * i] = pylon.y + pylon.height + pylon.gap // 2 - bird.y
+        out[4 + 3 * i] = pylon.gap
+    return out
+
+# Single Game
+# pixels=True adds the rendered frame to info["pixels"] as a (height, width, 3)
+# RGB view that the next step draws over (see pixels.py, needs pygame). Given
+# a pixels.FrameRing, frames are published there instead and
+# info["pixels_frame"] is the frame's number in the ring.
+class Env:
+    def __init__(self, seed=None, max_frames=None, pixels=False, ring=None, level=None):
+        self.seeds = random.Random(seed)
+        self.level = level
+        self.max_frames = max_frames
+        self.state = None
+        self.scene = None
+        if pixels or ring:
+            import pixels  # Only pixel observations need pygame
+            self.scene = pixels.Scene(ring)
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.seeds = random.Random(seed)
+        if self.state is None:
+            self.state = sim.new_game(self.seeds.randrange(2**32), self.level)
+        else:
+            self.state.reset(self.seeds.randrange(2**32))
+        return observe(self.state), self.info()
+
+    def step(self, action):
+        self.state, event = sim.step(self.state, bool(action))
+        reward = 0.0
+        if event & sim.SCORE:
+            reward += SCORE_REWARD
+        if event & sim.CRASH:
+            reward += CRASH_REWARD
+        terminated = self.state.game_over
+        truncated = self.max_frames is not None and self.state.frame >= self.max_frames and not terminated
+        return observe(self.state), reward, terminated, truncated, self.info()
+
+    def info(self):
+        info = {"score": self.state.score, "frame": self.state.frame, "seed": self.state.seed}
+        if self.scene:
+            frame, n = self.scene.render(self.state)
+            info["pixels"] = frame[:, :, 2::-1]  # pixels.rgb(), RGB view of the BGRA frame
+            if n is not None:
+                info["pixels_frame"] = n
+        return info
+
+# Many Games per Call
+# Steps n games at once on batch.BatchSim. Finished games restart on the
+# spot, as in Gymnasium's vector envs: the observation returned for them is
+# the first of the new game and info["final_score"] holds the old score.
+class VecEnv:
+    def __init__(self, n, seed=None, max_frames=None, level=None):
+        self.n = n
+        self.max_frames = max_frames
+        self.batch = batch.BatchSim(n, seed, level)
+        self.rows = np.arange(n)
+        self.observations = np.empty((n, OBSERVATION_SIZE), np.float32)
+
+    def reset(self):
+        self.batch.reset()
+        return self.observe(), {}
+
+    def step(self, actions):
+        events = self.batch.step(np.asarray(actions, bool))
+        rewards = np.where(events & sim.SCORE, SCORE_REWARD, 0.0).astype(np.float32)
+        rewards += np.where(events & sim.CRASH, CRASH_REWARD, 0.0)
+        terminated = self.batch.game_over.copy()
+        truncated = np.zeros(self.n, bool)
+        if self.max_frames is not None:
+            truncated = (self.batch.frame >= self.max_frames) & ~terminated
+        done = terminated | truncated
+        info = {}
+        if done.any():
+            info["final_score"] = np.where(done, self.batch.score, 0)
+            self.batch.reset(done)
+        return self.observe(), rewards, terminated, truncated, info
+
+    def observe(self):
+        b = self.batch
+        out = self.observations
+        out[:, 0] = b.y
+        out[:, 1] = np.where(b.isJumping, 1 - b.jumpSpeed, batch.GRAVITY)
+        x = b.pylon_x
+        first = b.next
+        first_x = x[self.rows, first]
+        second = np.argmin(np.where(x > first_x[:, None], x, np.iinfo(np.int32).max), axis=1)
+        for i, column in enumerate((first, second)):
+            gap = b.pylon_gap[self.rows, column]
+            out[:, 2 + 3 * i] = x[self.rows, column] - batch.BIRD_X
+            out[:, 3 + 3 * i] = b.pylon_y[self.rows, column] + batch.PYLON_HEIGHT + gap // 2 - b.y
+            out[:, 4 + 3 * i] = gap
+        return out.copy()
+
+# Throughput with random actions
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Environment steps per second with random actions")
+    parser.add_argument("--steps", type=int, default=100_000)
+    parser.add_argument("--envs", type=int, default=1_000, help="games per VecEnv step")
+    parser.add_argument("--pixels", action="store_true", help="also time the single env with pixel observations")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    env = Env(seed=0)
+    env.reset()
+    actions = rng.random(args.steps) < 0.1
+    start = time.perf_counter()
+    for action in actions:
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+    elapsed = time.perf_counter() - start
+    print(f"Env           {args.steps / elapsed:12,.0f} steps/s")
+
+    if args.pixels:
+        env = Env(seed=0, pixels=True)
+        env.reset()
+        steps = args.steps // 100
+        start = time.perf_counter()
+        for action in actions[:steps]:
+            _, _, terminated, truncated, _ = env.step(action)
+            if terminated or truncated:
+                env.reset()
+        elapsed = time.perf_counter() - start
+        print(f"Env (pixels)  {steps / elapsed:12,.0f} steps/s")
+
+    vec = VecEnv(args.envs, seed=0)
+    vec.reset()
+    calls = max(1, args.steps // args.envs)
+    start = time.perf_counter()
+    for _ in range(calls):
+        vec.step(rng.random(args.envs) < 0.1)
+    elapsed = time.perf_counter() - start
+    print(f"VecEnv x{args.envs:<5}{calls * args.envs / elapsed:12,.0f} steps/s")
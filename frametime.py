@@ -0,0 +1,103 @@
+# Frame-time recorder: keeps the last N frame durations from
+# pygame.time.Clock.get_time() in a fixed ring buffer (no allocation per
+# frame), counts missed 60 Hz deadlines and reports percentiles on exit.
+# LatencyProbe does the same for the delay from a key press to the frame
+# that shows it.
+import time
+from array import array
+
+DEADLINE_MS = 1000 / 60
+# Clock reports whole milliseconds and a 60 fps clock alternates 16/17 ms,
+# so a frame only counts as late once it is a full millisecond over
+SLACK_MS = 1
+
+class FrameTimes:
+    def __init__(self, capacity=36_000):  # 10 minutes at 60 fps
+        self.times = array("H", [0]) * capacity
+        self.count = 0
+        self.missed = 0
+        self.worst = 0
+
+    def record(self, ms):
+        ms = min(ms, 0xFFFF)
+        self.times[self.count % len(self.times)] = ms
+        self.count += 1
+        if ms > DEADLINE_MS + SLACK_MS:
+            self.missed += 1
+        if ms > self.worst:
+            self.worst = ms
+
+    def recorded(self):
+        return self.times[:min(self.count, len(self.times))]
+
+    # Nearest-rank percentile of the frames still in the buffer
+    def percentile(self, ordered, q):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+    def report(self, bucket_ms=2, buckets=12):
+        ordered = sorted(self.recorded())
+        if not ordered:
+            return "frame times: no frames recorded"
+        p50, p95, p99 = (self.percentile(ordered, q) for q in (50, 95, 99))
+        lines = [
+            f"frame times over {len(ordered)} frames: p50 {p50} ms  p95 {p95} ms  p99 {p99} ms  max {self.worst} ms",
+            f"missed {DEADLINE_MS:.1f} ms deadline: {self.missed} of {self.count} frames ({self.missed / self.count:.1%})",
+        ]
+        counts = [0] * buckets
+        for ms in ordered:
+            counts[min(ms // bucket_ms, buckets - 1)] += 1
+        peak = max(counts)
+        for i, count in enumerate(counts):
+            low = i * bucket_ms
+            label = f"{low:>3}-{low + bucket_ms:<3} ms" if i < buckets - 1 else f"{low:>3}+     ms"
+            lines.append(f"  {label} {count:>7}  {'#' * round(40 * count / peak)}")
+        return "\n".join(lines)
+
+# Input-to-display latency. A key press is stamped when the event queue is
+# read, and the clock stops at the display update after the simulation step
+# that used it. SDL doesn't hand pygame the time a key actually went down, so
+# each press also gets an upper bound measured from the read before: the
+# press arrived somewhere between the two reads.
+class LatencyProbe:
+    def __init__(self, capacity=10_000):
+        self.polled = self.previous_poll = time.perf_counter()
+        self.pending = []  # Read but not simulated yet
+        self.applied = []  # Simulated but not on screen yet
+        self.latency = array("f", [0.0]) * capacity
+        self.bound = array("f", [0.0]) * capacity
+        self.count = 0
+
+    # Call right before pygame.event.get()
+    def poll(self):
+        self.previous_poll = self.polled
+        self.polled = time.perf_counter()
+
+    def key_pressed(self):
+        self.pending.append((self.polled, self.previous_poll))
+
+    def input_used(self):
+        self.applied.extend(self.pending)
+        self.pending.clear()
+
+    # Call after display.update()
+    def presented(self):
+        if not self.applied:
+            return
+        now = time.perf_counter()
+        for polled, previous in self.applied:
+            slot = self.count % len(self.latency)
+            self.latency[slot] = (now - polled) * 1000
+            self.bound[slot] = (now - previous) * 1000
+            self.count += 1
+        self.applied.clear()
+
+    def report(self):
+        count = min(self.count, len(self.latency))
+        if not count:
+            return "input latency: no key presses recorded"
+        lines = [f"input-to-display latency over {count} key presses:"]
+        for name, values in (("from queue read", self.latency), ("from read before", self.bound)):
+            ordered = sorted(values[:count])
+            p50, p95 = (ordered[min(count - 1, int(count * q / 100))] for q in (50, 95))
+            lines.append(f"  {name:<17} p50 {p50:5.1f} ms  p95 {p95:5.1f} ms  max {ordered[-1]:5.1f} ms")
+        return "\n".join(lines)
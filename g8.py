@@ -1,220 +1,382 @@
-import pygame
-import random
+import time
+
+STARTED = time.perf_counter()  # For --startup-time
+
+import argparse
 import os
+import random
+import sys
+
+import sim
+from replay import Recorder
+from sim import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Command Line
+parser = argparse.ArgumentParser(description="Flappy Bird")
+parser.add_argument("--headless", action="store_true", help="run the game rules without a window or frame cap")
+parser.add_argument("--frames", type=int, default=1_000_000, help="frames to simulate in headless mode")
+parser.add_argument("--seed", type=int, default=None, help="seed for the sequence of games (default: random)")
+parser.add_argument("--record", metavar="DIR", help="save a replay of every game into DIR")
+parser.add_argument("--archive", metavar="FILE", help="append a replay of every finished game to this archive on exit")
+parser.add_argument("--sound-stats", action="store_true", help="print sound load and play timings on exit")
+parser.add_argument("--dirty-rects", action="store_true", help="only push changed parts of the window to the display")
+parser.add_argument("--clouds", type=int, default=5, help="number of clouds; more than 5 gives a denser, three-layer sky")
+parser.add_argument("--profile", metavar="FILE", help="time each stage of every frame and save it on exit (.json = Chrome trace, .csv = CSV)")
+parser.add_argument("--profile-overlay", action="store_true", help="show per-stage frame times on screen")
+parser.add_argument("--startup-time", action="store_true", help="print time to first frame and exit")
+parser.add_argument("--low-latency", action="store_true",
+                    help="draw the latest step as is, with no interpolation; the rules still run at 60 Hz")
+parser.add_argument("--busy-loop", action="store_true", help="pace frames with Clock.tick_busy_loop (more precise, burns a core)")
+parser.add_argument("--latency-probe", action="store_true", help="print key-press-to-display latency on exit")
+parser.add_argument("--difficulty", type=float, default=None,
+                    help="play procedurally generated levels that get harder, starting at this difficulty (0-1); "
+                         "they are kept off the leaderboard")
+parser.add_argument("--player", default="player", help="name to put on the leaderboard")
+parser.add_argument("--leaderboard", metavar="FILE", default="leaderboard.db", help="leaderboard database")
+parser.add_argument("--autopilot", action="store_true",
+                    help="attract mode: the autopilot plays game after game; its scores are kept off the leaderboard")
+parser.add_argument("--fps", type=int, default=60,
+                    help="cap the render rate, e.g. at a high-refresh display's rate (0 = uncapped); the rules always run at 60 Hz")
+args = parser.parse_args()
+if args.difficulty is not None and (args.record or args.archive):
+    parser.error("replays only cover the classic game, not --difficulty")
+if args.autopilot and (args.record or args.archive):
+    parser.error("autopilot games aren't recorded")
+
+level = None
+if args.difficulty is not None:
+    from level import CurveLevel  # Needs NumPy, so only loaded when asked for
+    level = CurveLevel(args.difficulty)
+
+if args.headless:
+    sim.print_report(sim.run_headless(args.frames, seed=args.seed, level=level))
+    sys.exit()
 
-# Initialize Pygame
-pygame.init()
+import pygame
 
-# Initialize Pygame Mixer for Sound
-pygame.mixer.init()
+from frametime import FrameTimes, LatencyProbe
+from highscore import HighScoreFile
+from hud import HUD
+from profiler import FrameProfiler, NullProfiler, ProfilerOverlay
+from render import Renderer, default_background
+from sounds import EFFECTS, SoundBank
+
+# Initialize Pygame
+# Only the display (which brings events with it) is needed for the first
+# frame; the mixer, sounds and fonts are brought up after or alongside it.
+imported = time.perf_counter()
+pygame.display.init()
 
 # Game Window
-SCREEN_WIDTH, SCREEN_HEIGHT = 400, 600
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 pygame.display.set_caption("Flappy Bird")
+renderer = Renderer(screen, default_background(args.clouds), dirty=args.dirty_rects)
+background = renderer.background
 
-# Colors
-SKY_BLUE = (135, 206, 235)
-BLACK = (0, 0, 0)
-WHITE = (255, 255, 255)
-GREY = (200, 200, 200)
-GREEN = (0, 128, 0)  # Color for the mountains
-ORANGE = (255, 140, 0)  # Color for the bird
-
-# Cloud Class for Background
-class Cloud:
-    def __init__(self):
-        self.x = random.randint(0, SCREEN_WIDTH)
-        self.y = random.randint(0, SCREEN_HEIGHT // 2)
-        self.size = random.randint(50, 100)
-
-    def update(self):
-        self.x -= 1  # Slower than mountains
-        if self.x < -self.size:
-            self.x = SCREEN_WIDTH + self.size
-            self.y = random.randint(0, SCREEN_HEIGHT // 2)
-
-    def draw(self):
-        pygame.draw.circle(screen, WHITE, (self.x, self.y), self.size)
-
-# Bird Class
-class Bird:
-    def __init__(self):
-        self.x = 50
-        self.y = 300
-        self.radius = 15
-        self.jumpSpeed = 10
-        self.gravity = 2
-        self.isJumping = False
-
-    def jump(self):
-        self.isJumping = True
-        self.jumpSpeed = 10
-        pygame.mixer.Sound("flapy bird/tap.wav").play()  # Play tap sound when jumping
-
-    def update(self):
-        if self.isJumping:
-            self.jumpSpeed -= 1
-            self.y -= self.jumpSpeed
-            if self.jumpSpeed < -10:
-                self.isJumping = False
-        else:
-            self.y += self.gravity
-
-    def draw(self):
-        pygame.draw.circle(screen, ORANGE, (self.x, self.y), self.radius)
-        # Small eye
-        pygame.draw.circle(screen, BLACK, (self.x + 5, self.y - 5), 2)
-
-# Pylon Class
-class Pylon:
-    def __init__(self, x):
-        self.x = x
-        self.y = random.randint(-150, 150)
-        self.width = 30
-        self.height = 300
-        self.gap = 200
-
-    def update(self):
-        self.x -= 2
-        if self.x < -self.width:
-            self.x = SCREEN_WIDTH
-            self.y = random.randint(-150, 150)
-
-    def collide(self, bird):
-        if bird.y - bird.radius < self.y + self.height or bird.y + bird.radius > self.y + self.height + self.gap:
-            if bird.x + bird.radius > self.x and bird.x - bird.radius < self.x + self.width:
-                return True
-        return False
-
-    def draw(self):
-        pygame.draw.rect(screen, BLACK, (self.x, 0, self.width, self.height + self.y))
-        pygame.draw.rect(screen, BLACK, (self.x, self.height + self.gap + self.y, self.width, SCREEN_HEIGHT - (self.height + self.gap + self.y)))
-
-# Function to Draw Mountains
-def draw_mountains():
-    mountain_points = [
-        (0, SCREEN_HEIGHT),
-        (100, 400),
-        (200, SCREEN_HEIGHT),
-        (300, 450),
-        (400, SCREEN_HEIGHT),
-        (500, 400),
-        (600, SCREEN_HEIGHT)
-    ]
-    pygame.draw.polygon(screen, GREEN, mountain_points)
-
-# Load Sounds
-game_over_sound = pygame.mixer.Sound("flapy bird/GO.wav")
-new_high_score_sound = pygame.mixer.Sound("flapy bird/nhs.wav")
+# Timing
+SIM_STEP = 1 / 60  # The rules are tuned for 60 updates per second
+MAX_FRAME_TIME = 0.25  # Don't try to catch up on more than this after a stall
 
-# Initialize Bird and Pylons
-bird = Bird()
-pylons = [Pylon(300), Pylon(600), Pylon(900)]
+# Load Sounds (on a background thread; effects are silent until it finishes)
+sounds = SoundBank()
+TAP, GAME_OVER, NEW_HIGH_SCORE = sounds.load_async(EFFECTS)
 
-# Initialize Clouds
-clouds = [Cloud() for _ in range(5)]
+# Initialize Bird and Pylons
+# Each game gets its own seed from this stream, so --seed reproduces a whole session
+seeds = random.Random(args.seed)
+state = sim.new_game(seeds.randrange(2**32), level)
+
+# Attract Mode
+ATTRACT_RESTART = 120  # Steps the game-over card stays up before the next game
+pilot = None
+if args.autopilot:
+    from autopilot import Autopilot
+    pilot = Autopilot()
+game_over_steps = 0
+
+# Only the player's classic games count towards the leaderboard and the high
+# score. Autopilot games aren't the player's, and --difficulty levels aren't
+# the game a seed replays as, so neither ranks against the rest.
+ranked = not pilot and level is None
+
+# Replay Recording
+if args.record:
+    os.makedirs(args.record, exist_ok=True)
+recorder = Recorder(state) if args.record or args.archive else None
+session_replays = []
+
+# Returns where the replay ends up, for the leaderboard. A game that didn't
+# end only gets its replay file: the archive's death frames are all deaths.
+def save_replay(ended=True):
+    replay = recorder.finish(state)
+    if ended:
+        session_replays.append(replay)
+    if args.record:
+        path = os.path.join(args.record, f"{int(time.time())}-{replay.seed}.fbr")
+        replay.save(path)
+        return path
+    return args.archive  # The seed picks it out of the archive
 
 # Scoring
 score = 0
-high_score = 0
 new_high_score_played = False
 
-# High Score File
-high_score_file = "high_score.txt"
-if os.path.exists(high_score_file):
-    with open(high_score_file, "r") as file:
-        high_score = int(file.read()) 
+# Leaderboard
+# Games go in one transaction when the session ends; high_score.txt is still
+# written on every new high score, so a crash can't lose the best score.
+# Opened once the first frame is up (see open_leaderboard); no game can end
+# before that, the pylons start well clear of the bird.
+leaderboard = None
+session = None
+rank = 0
+
+def open_leaderboard():
+    global leaderboard, session, high_score
+    from leaderboard import Leaderboard
+    leaderboard = Leaderboard(args.leaderboard)
+    session = leaderboard.session(args.player)
+    high_score = max(high_score, leaderboard.best())
+
+# Only games that ended go on the leaderboard. Unranked games aren't saved,
+# the card only shows where they would place.
+def finish_game():
+    if not ranked:
+        return session.rank(state.score)
+    replay = save_replay() if recorder else None
+    session.add(state.score, state.seed, replay)
+    return session.rank(state.score)
 
-# Font for Text
-font = pygame.font.SysFont(None, 24)
+# High Score File
+high_scores = HighScoreFile("high_score.txt")
+high_score = high_scores.load()
+
+# Font for Text, loaded once the first frame is up (see load_fonts)
+hud = None
+overlay = None
+
+def load_fonts():
+    global hud, overlay
+    pygame.font.init()
+    # Same font SysFont(None, 24) ends up with, minus the system font scan
+    hud = HUD(pygame.font.Font(None, 24))
+    if args.profile_overlay:
+        overlay = ProfilerOverlay(profiler, pygame.font.SysFont("monospace", 14))
+
+# Frame Profiler
+profiling = args.profile or args.profile_overlay
+profiler = FrameProfiler() if profiling else NullProfiler()
+
+def startup_report(first_frame):
+    fonts_loaded = time.perf_counter()
+    sounds.wait()
+    print(f"import pygame  {(imported - STARTED) * 1000:7.1f} ms")
+    print(f"first frame    {(first_frame - STARTED) * 1000:7.1f} ms")
+    print(f"fonts loaded   {(fonts_loaded - STARTED) * 1000:7.1f} ms")
+    if sounds.ready:
+        print(f"sounds ready   {(sounds.ready_at - STARTED) * 1000:7.1f} ms")
+    else:
+        print("sounds         failed to load")
 
 # Game State
 game_over = False
+in_background = False  # Window minimized or not focused
+
+# Idle
+# Nothing moves on the game-over card or while the window is in the
+# background, so instead of drawing the same frame 60 times a second the loop
+# sleeps in event.wait until something it has to react to comes in.
+# Nothing needs doing on a timer while it sleeps, so the wait has no timeout.
+BACKGROUND_EVENTS = (pygame.WINDOWFOCUSLOST, pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN)
+FOREGROUND_EVENTS = (pygame.WINDOWFOCUSGAINED, pygame.WINDOWRESTORED, pygame.WINDOWSHOWN)
+WAKE_EVENTS = (pygame.QUIT, pygame.KEYDOWN, pygame.WINDOWEXPOSED) + FOREGROUND_EVENTS
+
+def wait_for_input():
+    global in_background
+    while True:
+        event = pygame.event.wait()
+        if event.type in WAKE_EVENTS:
+            pygame.event.post(event)  # Handled by the loop as usual
+            return
+        if event.type in BACKGROUND_EVENTS:
+            in_background = True  # Keep sleeping, but remember for when something wakes the loop
+
+# Interpolation Between Simulation Steps
+def snapshot():
+    return state.bird.y, [pylon.x for pylon in state.pylons], background.offsets()
+
+def restart():
+    global game_over, score, new_high_score_played, previous, recorder
+    game_over = False
+    score = 0
+    new_high_score_played = False
+    state.reset(seeds.randrange(2**32))
+    previous = snapshot()
+    if recorder:
+        recorder = Recorder(state)
+
+def lerp(previous, current, alpha):
+    if abs(current - previous) > SCREEN_WIDTH // 2:  # Wrapped around, don't slide across the screen
+        return current
+    return round(previous + (current - previous) * alpha)
 
 # Main Game Loop
+# The rules always advance in fixed 1/60 s steps; rendering runs at the --fps
+# cap (60 by default, so an idle core isn't spent on identical frames) and
+# draws positions blended between the last two steps.
+# Blending draws the previous step partly, so --low-latency draws the latest
+# step as is. The steps due still run straight after input is read, so a flap
+# shows on the next frame that steps the rules.
 running = True
 clock = pygame.time.Clock()
+tick = clock.tick_busy_loop if args.busy_loop else clock.tick
+frame_times = FrameTimes()
+probe = LatencyProbe() if args.latency_probe else None
+flap = False
+accumulator = 0.0
+previous = snapshot()
+last_time = time.perf_counter()
 while running:
-    clock.tick(60)
-    screen.fill(SKY_BLUE)
-
-    # Draw Mountains and Clouds
-    draw_mountains()
-    for cloud in clouds:
-        cloud.update()
-        cloud.draw()
-
-    # Draw Bird and Pylons
-    bird.draw()
-    for pylon in pylons:
-        pylon.draw()
-
-    if not game_over:
-        # Event Handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
-                    bird.jump()
-
-        # Update Bird and Pylons
-        bird.update()
-        for pylon in pylons:
-            pylon.update()
-            if pylon.collide(bird):
-                game_over_sound.play()
+    tick(args.fps)
+    frame_times.record(clock.get_time())
+    profiler.lap("clock.tick")
+    now = time.perf_counter()
+    accumulator += min(now - last_time, MAX_FRAME_TIME)
+    last_time = now
+
+    # Event Handling
+    if probe:
+        probe.poll()
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            running = False
+        if event.type == pygame.WINDOWEXPOSED:
+            renderer.invalidate()
+        if event.type in BACKGROUND_EVENTS:
+            in_background = True
+        if event.type in FOREGROUND_EVENTS:
+            in_background = False
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE and not game_over:
+                flap = True
+                sounds.play(TAP)  # Play tap sound when jumping
+                if probe:
+                    probe.key_pressed()
+            if event.key == pygame.K_r and game_over:
+                restart()
+
+    profiler.lap("events")
+
+    # Fixed Timestep Updates
+    while accumulator >= SIM_STEP:
+        accumulator -= SIM_STEP
+        previous = snapshot()
+
+        background.update()
+
+        if pilot and game_over:
+            game_over_steps += 1
+            if game_over_steps == ATTRACT_RESTART:
+                restart()
+        elif pilot:
+            if pilot(state):
+                flap = True
+                sounds.play(TAP)
+
+        if not game_over:
+            # Update Bird and Pylons
+            if flap and recorder:
+                recorder.flap(state)
+            if flap and probe:
+                probe.input_used()
+            profiler.lap("update")
+            state, sim_event = sim.step(state, flap, profiler)
+            flap = False
+            score = state.score
+            if sim_event & sim.CRASH:
+                sounds.play(GAME_OVER)
                 game_over = True
+                game_over_steps = 0
+                rank = finish_game()
 
             # Scoring and High Score Check
-            if pylon.x == bird.x:
-                score += 1
+            if sim_event & sim.SCORE and ranked:
                 if score > high_score:
                     high_score = score
+                    high_scores.save(high_score)
                     if not new_high_score_played:
-                        new_high_score_sound.play()
+                        sounds.play(NEW_HIGH_SCORE)
                         new_high_score_played = True
 
-    else:
+    profiler.lap("update")
+    alpha = 1.0 if args.low_latency else accumulator / SIM_STEP
+    bird_y, pylon_xs, layer_offsets = previous
+
+    # Draw Sky, Mountains and Clouds
+    renderer.draw_background([lerp(x, offset, alpha) for x, offset in zip(layer_offsets, background.offsets())])
+    profiler.lap("background")
+
+    # Draw Bird and Pylons
+    renderer.draw_bird(state.bird, lerp(bird_y, state.bird.y, alpha))
+    for pylon, x in zip(state.pylons, pylon_xs):
+        renderer.draw_pylon(pylon, lerp(x, pylon.x, alpha))
+    profiler.lap("entities")
+
+    if hud and game_over:
         # Game Over Card
-        game_over_card = pygame.Surface((200, 100))
-        game_over_card.fill(WHITE)
-        game_over_text = font.render("Game Over", True, BLACK)
-        score_text = font.render(f"Score: {score}", True, BLACK)
-        high_score_text = font.render(f"High Score: {high_score}", True, BLACK)
-        restart_text = font.render("Press 'R' to Restart", True, BLACK)
-        game_over_card.blit(game_over_text, (50, 10))
-        game_over_card.blit(score_text, (50, 30))
-        game_over_card.blit(high_score_text, (50, 50))
-        game_over_card.blit(restart_text, (10, 70))
-        screen.blit(game_over_card, (SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 - 50))
-
-        # Event Handling for Restart
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r:
-                    game_over = False
-                    score = 0
-                    new_high_score_played = False
-                    bird = Bird()
-                    pylons = [Pylon(300), Pylon(600), Pylon(900)]
+        renderer.mark(hud.draw_game_over(screen, score, high_score, rank))
 
     # Score Card
-    score_card = pygame.Surface((200, 100))
-    score_card.fill(WHITE)
-    score_text = font.render(f"Score: {score}", True, BLACK)
-    high_score_text = font.render(f"High Score: {high_score}", True, BLACK)
-    score_card.blit(score_text, (20, 20))
-    score_card.blit(high_score_text, (20, 50))
-    screen.blit(score_card, (10, 10))
-
-    pygame.display.update()
+    if hud:
+        renderer.mark(hud.draw_score(screen, score, high_score))
+    if overlay:
+        renderer.mark(overlay.draw(screen))
+    profiler.lap("hud")
+
+    renderer.present()
+    if probe:
+        probe.presented()
+    profiler.lap("display.update")
+    profiler.end_frame()
+
+    if hud is None:
+        first_frame = time.perf_counter()
+        load_fonts()
+        if args.startup_time:
+            startup_report(first_frame)
+            running = False
+        else:
+            open_leaderboard()
+
+    if running and hud and ((game_over and not pilot) or in_background):
+        wait_for_input()
+        # Pick up from here, don't catch up on the time spent waiting
+        clock.tick()
+        profiler.skip()
+        last_time = time.perf_counter()
+        accumulator = 0.0
+        previous = snapshot()
+
+# Keep the replay of the game in progress too, but it didn't end, so it
+# stays off the leaderboard and out of the archive
+if not game_over and args.record and state.frame:
+    save_replay(ended=False)
+if args.archive:
+    import archive  # Needs NumPy, so only loaded when asked for
+    archive.append(args.archive, session_replays)
 
 # Save High Score
-with open(high_score_file, "w") as file:
-    file.write(str(high_score))
+high_scores.save(high_score)
+high_scores.close()
+if leaderboard:
+    session.commit()
+    leaderboard.close()
+print(frame_times.report())
+if probe:
+    print(probe.report())
+
+if args.sound_stats:
+    print(sounds.report())
+if args.profile:
+    profiler.export(args.profile)
 
 pygame.quit()
@@ -0,0 +1,67 @@
+# High score persistence: tolerant reading, atomic writes (temp file +
+# rename, so a crash leaves either the old or the new score on disk, never a
+# half-written file) and a background writer so the frame loop never waits on disk.
+import os
+import queue
+import tempfile
+import threading
+
+# Missing, empty or garbled files all count as no high score yet
+def read_high_score(path):
+    try:
+        with open(path, "r") as file:
+            return max(0, int(file.read().strip() or 0))
+    except (OSError, ValueError):
+        return 0
+
+def write_atomic(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".high_score-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+class HighScoreFile:
+    def __init__(self, path):
+        self.path = path
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.writer, daemon=True)
+        self.thread.start()
+
+    def load(self):
+        return read_high_score(self.path)
+
+    # Hand a new high score to the writer thread; returns immediately
+    def save(self, score):
+        self.queue.put(score)
+
+    def writer(self):
+        while True:
+            score = self.queue.get()
+            if score is None:
+                return
+            # Only the newest score matters, skip any that piled up behind it
+            while not self.queue.empty():
+                newer = self.queue.get_nowait()
+                if newer is None:
+                    self.write(score)
+                    return
+                score = newer
+            self.write(score)
+
+    def write(self, score):
+        try:
+            write_atomic(self.path, str(score))
+        except OSError as error:
+            print(f"could not save high score: {error}")
+
+    # Finish pending writes and stop the writer thread
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
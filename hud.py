@@ -0,0 +1,64 @@
+# HUD layer: the score card and game-over card are cached surfaces that are
+# only rebuilt when a value on them changes. Numbers are composed from a
+# pre-rendered digit atlas, so the frame loop never rasterizes text.
+import pygame
+
+# Colors
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+
+# Glyphs for 0-9, rendered once
+class DigitAtlas:
+    def __init__(self, font, color):
+        self.glyphs = [font.render(str(digit), True, color) for digit in range(10)]
+
+    # Blit a non-negative integer at pos; returns the x just past the last digit
+    def draw(self, surface, value, pos):
+        x, y = pos
+        for char in str(value):
+            glyph = self.glyphs[ord(char) - 48]
+            surface.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return x
+
+# Card with fixed text lines, some followed by a number
+class Card:
+    def __init__(self, font, digits, size, lines):
+        self.digits = digits
+        self.surface = pygame.Surface(size).convert()
+        self.lines = [(font.render(text, True, BLACK), pos) for text, pos in lines]
+        self.values = None
+
+    # Rebuild only if the numbers changed since the last draw
+    def draw(self, screen, pos, values):
+        if values != self.values:
+            self.values = values
+            self.surface.fill(WHITE)
+            for i, (label, (x, y)) in enumerate(self.lines):
+                self.surface.blit(label, (x, y))
+                if i < len(values):
+                    self.digits.draw(self.surface, values[i], (x + label.get_width(), y))
+        return screen.blit(self.surface, pos)
+
+class HUD:
+    def __init__(self, font):
+        self.digits = DigitAtlas(font, BLACK)
+        self.score_card = Card(font, self.digits, (200, 100), [
+            ("Score: ", (20, 20)),
+            ("High Score: ", (20, 50)),
+        ])
+        # Numbered lines first, so values line up with them
+        self.game_over_card = Card(font, self.digits, (200, 120), [
+            ("Score: ", (50, 30)),
+            ("High Score: ", (50, 50)),
+            ("Rank: ", (50, 70)),
+            ("Game Over", (50, 10)),
+            ("Press 'R' to Restart", (10, 90)),
+        ])
+
+    def draw_score(self, screen, score, high_score):
+        return self.score_card.draw(screen, (10, 10), (score, high_score))
+
+    def draw_game_over(self, screen, score, high_score, rank):
+        width, height = screen.get_size()
+        return self.game_over_card.draw(screen, (width // 2 - 100, height // 2 - 60), (score, high_score, rank))
@@ -0,0 +1,136 @@
+# Local leaderboard in SQLite: every finished game with player, score, time,
+# seed and a reference to its replay. A small per-score count table, kept up
+# to date by a trigger, answers rank and percentile by summing over distinct
+# scores instead of counting rows, so it stays fast with millions of games.
+import argparse
+import random
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    played_at REAL NOT NULL,
+    seed INTEGER,
+    replay TEXT
+);
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC);
+CREATE INDEX IF NOT EXISTS scores_by_player ON scores (player, score DESC);
+
+CREATE TABLE IF NOT EXISTS score_counts (
+    score INTEGER PRIMARY KEY,
+    games INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS count_score AFTER INSERT ON scores BEGIN
+    INSERT INTO score_counts (score, games) VALUES (new.score, 1)
+    ON CONFLICT (score) DO UPDATE SET games = games + 1;
+END;
+"""
+
+class Leaderboard:
+    def __init__(self, path="leaderboard.db"):
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    # rows: (player, score, played_at, seed, replay); one transaction for all
+    def add_many(self, rows):
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO scores (player, score, played_at, seed, replay) VALUES (?, ?, ?, ?, ?)", rows)
+
+    def top(self, k=10):
+        return self.db.execute(
+            "SELECT player, score, played_at, seed, replay FROM scores ORDER BY score DESC LIMIT ?", (k,)).fetchall()
+
+    def player_best(self, player):
+        row = self.db.execute(
+            "SELECT score FROM scores WHERE player = ? ORDER BY score DESC LIMIT 1", (player,)).fetchone()
+        return row[0] if row else None
+
+    def best(self):
+        return self.db.execute("SELECT COALESCE(MAX(score), 0) FROM score_counts").fetchone()[0]
+
+    def games(self):
+        return self.db.execute("SELECT COALESCE(SUM(games), 0) FROM score_counts").fetchone()[0]
+
+    # 1 + number of games with a strictly higher score
+    def rank(self, score):
+        return 1 + self.db.execute(
+            "SELECT COALESCE(SUM(games), 0) FROM score_counts WHERE score > ?", (score,)).fetchone()[0]
+
+    # Share of games that scored less than this
+    def percentile(self, score):
+        below, total = self.db.execute(
+            "SELECT COALESCE(SUM(CASE WHEN score < ? THEN games END), 0), COALESCE(SUM(games), 0) FROM score_counts",
+            (score,)).fetchone()
+        return 100 * below / total if total else 100.0
+
+    def session(self, player):
+        return Session(self, player)
+
+# Games of one play session, held in memory and written in a single
+# transaction by commit(). Ranks take the uncommitted games into account.
+class Session:
+    def __init__(self, board, player):
+        self.board = board
+        self.player = player
+        self.rows = []
+
+    def add(self, score, seed=None, replay=None):
+        self.rows.append((self.player, score, time.time(), seed, replay))
+
+    def rank(self, score):
+        return self.board.rank(score) + sum(1 for row in self.rows if row[1] > score)
+
+    def commit(self):
+        if self.rows:
+            self.board.add_many(self.rows)
+            self.rows = []
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Flappy Bird leaderboard")
+    parser.add_argument("--db", default="leaderboard.db")
+    commands = parser.add_subparsers(dest="command", required=True)
+    top = commands.add_parser("top", help="best games")
+    top.add_argument("-k", type=int, default=10)
+    player = commands.add_parser("player", help="a player's best score and its rank")
+    player.add_argument("name")
+    rank = commands.add_parser("rank", help="rank and percentile of a score")
+    rank.add_argument("score", type=int)
+    fill = commands.add_parser("fill", help="add random games and time the queries (for testing)")
+    fill.add_argument("--games", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    board = Leaderboard(args.db)
+    if args.command == "top":
+        for i, (name, score, played_at, seed, replay) in enumerate(board.top(args.k), 1):
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(played_at))
+            print(f"{i:>4}. {name:<16} {score:>6}  {when}  seed {seed}  {replay or ''}")
+    elif args.command == "player":
+        best = board.player_best(args.name)
+        if best is None:
+            print(f"{args.name} has no games")
+        else:
+            print(f"{args.name}: best {best}, rank {board.rank(best)} of {board.games()}")
+    elif args.command == "rank":
+        print(f"score {args.score}: rank {board.rank(args.score)} of {board.games()}, "
+              f"better than {board.percentile(args.score):.1f}% of games")
+    elif args.command == "fill":
+        rng = random.Random(0)
+        start = time.perf_counter()
+        rows = ((f"bot{rng.randrange(1000)}", int(rng.expovariate(1 / 12)), time.time(), rng.randrange(2**32), None)
+                for _ in range(args.games))
+        board.add_many(rows)
+        print(f"added {args.games} games in {time.perf_counter() - start:.1f}s")
+        for name, query in (("rank", lambda: board.rank(10)), ("percentile", lambda: board.percentile(10)),
+                            ("top 10", lambda: board.top(10)), ("player best", lambda: board.player_best("bot7"))):
+            start = time.perf_counter()
+            for _ in range(100):
+                query()
+            print(f"{name:<12} {(time.perf_counter() - start) * 10:.3f} ms")
+    board.close()
@@ -0,0 +1,150 @@
+# Procedural levels with a difficulty curve. Every pylon's spec (spacing
+# from the pylon before it, gap offset, gap size, speed) is a pure function
+# of the game seed and the pylon's number, computed with a counter-based
+# hash. That lets sim.py stream specs in NumPy blocks and batch.py compute
+# them for whole arrays of games at once, with no random calls per pylon.
+#
+# All pylons of a game scroll at one speed, the speed of the pylon placed
+# last: pylons moving at different speeds would overtake each other. The
+# speed follows the curve without the wobble, so it only ever goes up.
+#
+# The hash picks each gap offset anywhere in -OFFSET..OFFSET, but the bird
+# sinks slowly, and on tight spacing at full speed it can't get from a high
+# gap down to a low one. So offsets are then moved, one pylon after the
+# other, to where the bird can reach from the gap before (see reach). That
+# part is sequential: sim.py's stream carries the reachable range from pylon
+# to pylon, batch.py keeps it in an array per game.
+import argparse
+
+import numpy as np
+
+import sim
+
+# Easiest and hardest values; difficulty 0..1 picks a point in between
+GAP = (200, 130)
+SPACING = (300, 190)
+SPEED = (2, 4)
+OFFSET = 150  # Gap offsets are uniform in -OFFSET..OFFSET, as in the classic game
+JITTER = 0.15  # Seeded wobble around the curve, so it isn't a smooth ramp
+
+BLOCK = 64  # Specs generated per NumPy call in stream()
+
+# What the bird can do between two gaps (sim.Bird rules): without flapping it
+# sinks `gravity` a frame, flapping every frame it climbs jumpSpeed - 1.
+BIRD = sim.Bird()
+PYLON = sim.Pylon()
+FALL = BIRD.gravity
+CLIMB = BIRD.jumpSpeed - 1
+REACH_MARGIN = 15  # Pixels of slack left at both ends, so a gap isn't only just reachable
+START_RUN = sim.PYLON_START[0] - BIRD.radius - BIRD.x  # Bird's start to the first pylon
+LOOKAHEAD = len(sim.PYLON_START) - 1  # Pylons placed, each setting the speed, before the bird gets to one
+
+# SplitMix64 finalizer, element-wise on uint64 arrays
+def mix(z):
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+def uniform(z):
+    return (z >> np.uint64(11)).astype(np.float64) / 2.0**53
+
+def lerp(pair, d):
+    return np.rint(pair[0] + (pair[1] - pair[0]) * d).astype(np.int32)
+
+# Move a gap offset within reach of the gap before. low..high is where the
+# bird's centre can be passing the gap before; scrolling `distance` pixels at
+# `speed` it can get up to CLIMB a frame higher or FALL a frame lower. Returns
+# the offset, moved only as far as needed, and the part of the new gap the
+# bird can be in. Element-wise on arrays or plain numbers.
+def reach(offset, gap, distance, speed, low, high):
+    frames = distance // speed
+    highest = low - CLIMB * frames + REACH_MARGIN
+    lowest = high + FALL * frames - REACH_MARGIN
+    top = PYLON.height + BIRD.radius  # Bird's centre fits from offset + top to offset + top + room
+    room = gap - 2 * BIRD.radius
+    offset = np.clip(offset, highest - top - room, lowest - top)
+    return offset, np.maximum(offset + top, highest), np.minimum(offset + top + room, lowest)
+
+# Difficulty climbs linearly from `start` to 1 over `ramp` pylons, then stays there
+class CurveLevel:
+    def __init__(self, start=0.0, ramp=100):
+        self.start_difficulty = start
+        self.ramp = ramp
+
+    def curve(self, index):
+        return self.start_difficulty + (1 - self.start_difficulty) * np.minimum(index / self.ramp, 1.0)
+
+    def difficulty(self, index, wobble):
+        return np.clip(self.curve(index) + JITTER * (wobble - 0.5), 0.0, 1.0)
+
+    def scroll_speed(self, indices):
+        return lerp(SPEED, self.curve(np.asarray(indices, np.float64)))
+
+    # Specs of pylon number `indices` in the games with these seeds (arrays
+    # broadcast together); returns int32 arrays spacing, offset, gap, speed
+    def specs(self, seeds, indices):
+        with np.errstate(over="ignore"):
+            key = np.asarray(seeds, np.uint64) * np.uint64(0x9E3779B97F4A7C15) + np.asarray(indices, np.uint64)
+            a = mix(key)
+            b = mix(a + np.uint64(1))
+        indices = np.asarray(indices, np.float64)
+        d = self.difficulty(indices, uniform(b))
+        offset = np.rint((uniform(a) * 2 - 1) * OFFSET).astype(np.int32)
+        return lerp(SPACING, d), offset, lerp(GAP, d), self.scroll_speed(np.broadcast_to(indices, d.shape))
+
+    # Offsets of pylon number `indices` moved within reach of the pylon
+    # before, which the bird could be passing anywhere in low..high; returns
+    # the offsets and the new low, high. Element-wise, one pylon per game.
+    def within_reach(self, indices, spacing, offset, gap, low, high):
+        distance = np.where(indices == 0, START_RUN, spacing - PYLON.width - 2 * BIRD.radius)
+        # The speed can still go up while the bird is on its way
+        return reach(offset, gap, distance, self.scroll_speed(indices + LOOKAHEAD), low, high)
+
+    # Endless specs of one game, as (spacing, offset, gap, speed) tuples
+    def stream(self, seed):
+        low = high = BIRD.y
+        first = 0
+        while True:
+            columns = self.specs(seed, np.arange(first, first + BLOCK))
+            for index, (spacing, offset, gap, speed) in enumerate(zip(*(column.tolist() for column in columns)), first):
+                offset, low, high = self.within_reach(index, spacing, offset, gap, low, high)
+                yield spacing, int(offset), gap, speed
+            first += BLOCK
+
+    # sim.py level interface: place the first three pylons, then each one
+    # that scrolls off goes behind the one furthest right and sets the speed
+    # of them all
+    def start(self, state):
+        state.specs = self.stream(state.seed)
+        x = sim.PYLON_START[0]
+        for pylon in state.pylons:
+            spacing, offset, gap, speed = next(state.specs)
+            if pylon is not state.pylons[0]:
+                x += spacing
+            pylon.place(x, offset, gap)
+        for pylon in state.pylons:
+            pylon.speed = speed
+
+    def recycle(self, state, pylon):
+        spacing, offset, gap, speed = next(state.specs)
+        rightmost = max(other.x for other in state.pylons if other is not pylon)
+        pylon.place(rightmost + spacing, offset, gap)
+        for other in state.pylons:
+            other.speed = speed
+
+# How the built-in bot copes as levels get harder
+if __name__ == "__main__":
+    import batch
+
+    parser = argparse.ArgumentParser(description="follow_gap scores on curve levels of rising starting difficulty")
+    parser.add_argument("--games", type=int, default=10_000)
+    parser.add_argument("--frames", type=int, default=6_000)
+    parser.add_argument("--ramp", type=int, default=100)
+    args = parser.parse_args()
+
+    # Games still running when the frames run out count at their score so far;
+    # leaving them out would drop the longest games from the easy levels
+    print(f"{'start':>5} {'ended':>7} {'running':>7} {'mean score':>11} {'best':>6}")
+    for start in (0.0, 0.25, 0.5, 0.75, 1.0):
+        report = batch.run_batch(args.games, args.frames, seed=0, level=CurveLevel(start, args.ramp))
+        print(f"{start:>5.2f} {report['games']:>7} {report['running']:>7} {report['mean_score_all']:>11.2f} {report['best_score']:>6}")
@@ -0,0 +1,190 @@
+# Off-screen rendering of game states into NumPy memory, for pixel-based
+# agents. Frames are drawn straight into an array (optionally one slot of a
+# shared-memory ring buffer) through a surface made over that memory, so
+# there is no copy between pygame, NumPy and the processes reading them.
+#
+# surfarray.pixels3d() would give the same kind of view, but it keeps the
+# surface locked while the array lives, and a locked surface can't be drawn on.
+import argparse
+import os
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pygame
+
+import render
+import sim
+from sim import SCREEN_WIDTH, SCREEN_HEIGHT
+
+FRAME_SHAPE = (SCREEN_HEIGHT, SCREEN_WIDTH, 4)  # Rows of B, G, R, A bytes
+HEADER_SIZE = 64
+
+# Surfaces are converted to the display format, so a display has to exist;
+# the dummy driver gives one without opening a window
+def init_display():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+
+# (height, width, 3) RGB view of a BGRA frame, without copying
+def rgb(frame):
+    return frame[:, :, 2::-1]
+
+# Before Python 3.13, attaching to shared memory by name registers it with
+# this process's resource tracker, which unlinks it when the process exits,
+# under the writer that still owns it. Unregistering afterwards isn't enough:
+# a multiprocessing child shares its parent's tracker, and would take the
+# owner's registration with it. So readers never register at all.
+def attach(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+# Ring Buffer of Frames in Shared Memory
+# One process writes, any number read by name. The header holds how many
+# frames have been published; frame n lives in slot n % slots and stays valid
+# until the writer comes round again.
+class FrameRing:
+    def __init__(self, slots=8, name=None):
+        size = HEADER_SIZE + slots * int(np.prod(FRAME_SHAPE))
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(create=True, size=size) if self.owner else attach(name)
+        self.name = self.shm.name
+        self.published = np.ndarray((1,), np.int64, self.shm.buf)
+        self.slots = (self.shm.size - HEADER_SIZE) // int(np.prod(FRAME_SHAPE))
+        self.frames = np.ndarray((self.slots,) + FRAME_SHAPE, np.uint8, self.shm.buf, HEADER_SIZE)
+        if self.owner:
+            self.published[0] = 0
+
+    # Writer: the slot the next frame goes into, and making it visible
+    def next_slot(self):
+        return self.frames[self.published[0] % self.slots]
+
+    def publish(self):
+        self.published[0] += 1
+        return int(self.published[0]) - 1
+
+    # Reader: frame n as a view, and whether it has been overwritten since
+    def frame(self, n):
+        return self.frames[n % self.slots]
+
+    def valid(self, n):
+        return 0 <= n and int(self.published[0]) - n <= self.slots - 1
+
+    def latest(self):
+        n = int(self.published[0]) - 1
+        return n, self.frame(n) if n >= 0 else None
+
+    def close(self):
+        self.published = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+# Draws game states into a NumPy frame. With a FrameRing, each frame goes
+# into the ring's next slot and is published; without one, into a single
+# buffer that the next render() overwrites.
+class Scene:
+    def __init__(self, ring=None):
+        init_display()
+        self.ring = ring
+        self.background = render.default_background(seed=0)
+        self.surfaces = {}
+        self.frame = np.zeros(FRAME_SHAPE, np.uint8)
+
+    def surface(self, frame):
+        key = frame.ctypes.data
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.surfaces[key] = pygame.image.frombuffer(frame, (SCREEN_WIDTH, SCREEN_HEIGHT), "BGRA")
+        return surface
+
+    # Returns the BGRA frame; n is its number in the ring (None without one)
+    def render(self, state):
+        frame = self.ring.next_slot() if self.ring else self.frame
+        surface = self.surface(frame)
+        self.background.update()
+        self.background.draw(surface, self.background.offsets())
+        render.draw_bird(surface, state.bird, state.bird.y)
+        for pylon in state.pylons:
+            render.draw_pylon(surface, pylon, pylon.x)
+        n = self.ring.publish() if self.ring else None
+        return frame, n
+
+# Benchmark reader: attaches to the ring by name and sums the newest frame
+def read_frames(name, count, results):
+    ring = FrameRing(name=name)
+    seen = -1
+    total = 0
+    while seen < count - 1:
+        n, frame = ring.latest()
+        if n > seen:
+            total += int(rgb(frame)[::8, ::8].sum())
+            seen = n
+        else:
+            time.sleep(0.0005)  # Nothing new yet, let the writer run
+    results.put(total)
+    ring.close()
+
+def read_pickled(queue, count, results):
+    total = 0
+    for _ in range(count):
+        total += int(queue.get()[::8, ::8].sum())
+    results.put(total)
+
+# Compare handing frames to another process through shared memory vs a Queue
+if __name__ == "__main__":
+    import multiprocessing
+
+    parser = argparse.ArgumentParser(description="Frames per second handed to a second process")
+    parser.add_argument("--frames", type=int, default=2_000)
+    args = parser.parse_args()
+
+    def states():
+        state = sim.new_game(0)
+        for _ in range(args.frames):
+            state, event = sim.step(state, sim.follow_gap(state))
+            if event & sim.CRASH:
+                state = sim.new_game(0)
+            yield state
+
+    scene = Scene()
+    start = time.perf_counter()
+    for state in states():
+        scene.render(state)
+    elapsed = time.perf_counter() - start
+    print(f"render only            {args.frames / elapsed:8,.0f} frames/s")
+
+    results = multiprocessing.Queue()
+    queue = multiprocessing.Queue(maxsize=8)
+    reader = multiprocessing.Process(target=read_pickled, args=(queue, args.frames, results))
+    reader.start()
+    start = time.perf_counter()
+    for state in states():
+        frame, _ = scene.render(state)
+        queue.put(np.ascontiguousarray(rgb(frame)))
+    results.get()
+    elapsed = time.perf_counter() - start
+    reader.join()
+    print(f"multiprocessing.Queue  {args.frames / elapsed:8,.0f} frames/s")
+
+    ring = FrameRing()
+    scene = Scene(ring)
+    reader = multiprocessing.Process(target=read_frames, args=(ring.name, args.frames, results))
+    reader.start()
+    start = time.perf_counter()
+    for state in states():
+        scene.render(state)
+    results.get()
+    elapsed = time.perf_counter() - start
+    reader.join()
+    ring.close()
+    print(f"shared memory ring     {args.frames / elapsed:8,.0f} frames/s")
@@ -0,0 +1,164 @@
+# Per-stage frame profiler. The loop calls lap(stage) as it finishes each
+# stage; the time since the previous lap is charged to that stage. Segments go
+# into preallocated ring buffers so recording doesn't allocate, and can be
+# exported as Chrome trace-event JSON (chrome://tracing, Perfetto) or CSV.
+import csv
+import json
+import time
+from array import array
+
+import pygame
+
+# Stages of the g8.py frame, in loop order
+STAGES = (
+    "clock.tick",
+    "events",
+    "update",
+    "bird.update",
+    "pylons",
+    "background",
+    "entities",
+    "hud",
+    "display.update",
+)
+
+class FrameProfiler:
+    def __init__(self, stages=STAGES, frames=10_000):
+        self.stages = list(stages)
+        self.index = {name: i for i, name in enumerate(self.stages)}
+        count = len(self.stages)
+        segments = frames * count * 2
+
+        # Every timed segment: stage, start and duration in ns
+        self.segment_stage = array("b", [0]) * segments
+        self.segment_start = array("q", [0]) * segments
+        self.segment_time = array("q", [0]) * segments
+        self.segments = 0
+
+        # Per frame: start, and total ns in each stage
+        self.frame_start = array("q", [0]) * frames
+        self.frame_stages = array("q", [0]) * (frames * count)
+        self.frames = 0
+        self.current = array("q", [0]) * count
+
+        self.last = time.perf_counter_ns()
+        self.started = self.last
+
+    def lap(self, stage):
+        now = time.perf_counter_ns()
+        elapsed = now - self.last
+        i = self.index[stage]
+        slot = self.segments % len(self.segment_stage)
+        self.segment_stage[slot] = i
+        self.segment_start[slot] = self.last
+        self.segment_time[slot] = elapsed
+        self.segments += 1
+        self.current[i] += elapsed
+        self.last = now
+
+    # Leave the time since the last lap out (the loop was asleep)
+    def skip(self):
+        self.last = self.started = time.perf_counter_ns()
+
+    def end_frame(self):
+        count = len(self.stages)
+        slot = self.frames % len(self.frame_start)
+        self.frame_start[slot] = self.started
+        base = slot * count
+        for i in range(count):
+            self.frame_stages[base + i] = self.current[i]
+            self.current[i] = 0
+        self.frames += 1
+        self.started = self.last
+
+    # Recorded frames, oldest first: (start ns, [ns per stage])
+    def recorded_frames(self):
+        count = len(self.stages)
+        size = len(self.frame_start)
+        first = max(0, self.frames - size)
+        for n in range(first, self.frames):
+            slot = n % size
+            yield self.frame_start[slot], self.frame_stages[slot * count:(slot + 1) * count].tolist()
+
+    # Mean ms per stage over the last `frames` frames
+    def averages(self, frames=60):
+        count = len(self.stages)
+        size = len(self.frame_start)
+        frames = min(frames, self.frames, size)
+        totals = [0] * count
+        for n in range(self.frames - frames, self.frames):
+            base = (n % size) * count
+            for i in range(count):
+                totals[i] += self.frame_stages[base + i]
+        return {name: totals[i] / frames / 1e6 if frames else 0.0 for i, name in enumerate(self.stages)}
+
+    def export_chrome_trace(self, path):
+        size = len(self.segment_stage)
+        first = max(0, self.segments - size)
+        origin = min((start for start, _ in self.recorded_frames()), default=0)
+        events = []
+        for start, stages in self.recorded_frames():
+            events.append({"name": "frame", "ph": "X", "pid": 1, "tid": 1,
+                           "ts": (start - origin) / 1000, "dur": sum(stages) / 1000})
+        for n in range(first, self.segments):
+            slot = n % size
+            start = self.segment_start[slot]
+            if start < origin:
+                continue
+            events.append({"name": self.stages[self.segment_stage[slot]], "ph": "X", "pid": 1, "tid": 1,
+                           "ts": (start - origin) / 1000, "dur": self.segment_time[slot] / 1000})
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    def export_csv(self, path):
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame", "start_ms", "total_ms"] + [f"{name}_ms" for name in self.stages])
+            frames = list(self.recorded_frames())
+            origin = frames[0][0] if frames else 0
+            first = self.frames - len(frames)
+            for n, (start, stages) in enumerate(frames, first):
+                writer.writerow([n, f"{(start - origin) / 1e6:.3f}", f"{sum(stages) / 1e6:.3f}"]
+                                + [f"{ns / 1e6:.3f}" for ns in stages])
+
+    # .csv gets CSV, anything else a Chrome trace
+    def export(self, path):
+        if path.endswith(".csv"):
+            self.export_csv(path)
+        else:
+            self.export_chrome_trace(path)
+
+# Stand-in when profiling is off, so the loop can lap unconditionally
+class NullProfiler:
+    def lap(self, stage):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def skip(self):
+        pass
+
+# On-screen overlay with per-stage averages, re-rendered a few times a second
+class ProfilerOverlay:
+    def __init__(self, profiler, font, interval=0.25):
+        self.profiler = profiler
+        self.font = font
+        self.interval = interval
+        self.next_update = 0.0
+        self.surface = None
+
+    def draw(self, screen):
+        now = time.perf_counter()
+        if self.surface is None or now >= self.next_update:
+            self.next_update = now + self.interval
+            averages = self.profiler.averages()
+            lines = [f"{name:<15}{ms:6.2f} ms" for name, ms in averages.items()]
+            lines.append(f"{'frame':<15}{sum(averages.values()):6.2f} ms")
+            height = self.font.get_linesize()
+            self.surface = pygame.Surface((190, height * len(lines) + 8), pygame.SRCALPHA)
+            self.surface.fill((0, 0, 0, 160))
+            for i, line in enumerate(lines):
+                self.surface.blit(self.font.render(line, True, (255, 255, 255)), (6, 4 + i * height))
+        width, height = screen.get_size()
+        return screen.blit(self.surface, (width - self.surface.get_width() - 6, height - self.surface.get_height() - 6))
@@ -0,0 +1,250 @@
+# Scene drawing for g8.py, plus a renderer that can push only the changed
+# parts of the window to the display (dirty rectangles).
+import argparse
+import random
+import time
+
+import pygame
+
+import sim
+from sim import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Colors
+SKY_BLUE = (135, 206, 235)
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+GREY = (200, 200, 200)
+LIGHT_GREY = (228, 228, 228)
+GREEN = (0, 128, 0)  # Color for the mountains
+ORANGE = (255, 140, 0)  # Color for the bird
+
+# Cloud Class for Background
+# Clouds don't move on their own: each is baked once into a ParallaxLayer
+# strip, and it is the strip that scrolls and wraps.
+class Cloud:
+    __slots__ = ("x", "y", "size")
+
+    def __init__(self, rng):
+        self.x = rng.randint(0, SCREEN_WIDTH)
+        self.y = rng.randint(0, SCREEN_HEIGHT // 2)
+        self.size = rng.randint(50, 100)
+
+    def draw(self, surface, x, color=WHITE):
+        return surface.blit(cloud_sprite(self.size, color), (x - self.size, self.y - self.size))
+
+# Cloud sprites, rasterized once per size and then only blitted
+cloud_sprites = {}
+
+def cloud_sprite(size, color=WHITE):
+    sprite = cloud_sprites.get((size, color))
+    if sprite is None:
+        sprite = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, color, (size, size), size)
+        sprite = sprite.convert_alpha()
+        cloud_sprites[size, color] = sprite
+    return sprite
+
+# Draw Bird
+def draw_bird(surface, bird, y):
+    rect = pygame.draw.circle(surface, ORANGE, (bird.x, y), bird.radius)
+    # Small eye
+    pygame.draw.circle(surface, BLACK, (bird.x + 5, y - 5), 2)
+    return rect
+
+# Draw Pylon
+def draw_pylon(surface, pylon, x):
+    top = pygame.draw.rect(surface, BLACK, (x, 0, pylon.width, pylon.height + pylon.y))
+    bottom = pygame.draw.rect(surface, BLACK, (x, pylon.height + pylon.gap + pylon.y, pylon.width, SCREEN_HEIGHT - (pylon.height + pylon.gap + pylon.y)))
+    return top.union(bottom)
+
+# Function to Draw Mountains
+def draw_mountains(surface):
+    mountain_points = [
+        (0, SCREEN_HEIGHT),
+        (100, 400),
+        (200, SCREEN_HEIGHT),
+        (300, 450),
+        (400, SCREEN_HEIGHT),
+        (500, 400),
+        (600, SCREEN_HEIGHT)
+    ]
+    pygame.draw.polygon(surface, GREEN, mountain_points)
+
+# Background Layers
+# The sky and mountains never change, so they are drawn once into a
+# display-format surface. Clouds are pre-drawn into wide strips that tile
+# horizontally; each frame a strip is blitted twice at its scroll offset.
+# Only the clouds' boxes count as drawn: the rest of a strip is see-through,
+# so it never changes what is on the screen.
+COLORKEY = (255, 0, 255)
+SCREEN_RECT = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+
+class ParallaxLayer:
+    def __init__(self, clouds, speed=1, color=WHITE):
+        self.speed = speed
+        self.offset = 0
+        self.width = SCREEN_WIDTH + 2 * max(cloud.size for cloud in clouds)
+        self.height = max(cloud.y + cloud.size for cloud in clouds)
+        self.boxes = [pygame.Rect(cloud.x - cloud.size, cloud.y - cloud.size, cloud.size * 2, cloud.size * 2)
+                      for cloud in clouds]
+        self.surface = pygame.Surface((self.width, self.height)).convert()
+        self.surface.fill(COLORKEY)
+        for cloud in clouds:
+            # Copies one strip-width either side make the strip wrap seamlessly
+            for dx in (-self.width, 0, self.width):
+                cloud.draw(self.surface, cloud.x + dx, color)
+        self.surface.set_colorkey(COLORKEY, pygame.RLEACCEL)
+
+    def update(self):
+        self.offset = (self.offset + self.speed) % self.width
+
+    # Returns the on-screen boxes of the clouds, in the same order every frame
+    def draw(self, surface, offset):
+        x = -int(offset)
+        surface.blit(self.surface, (x, 0))
+        surface.blit(self.surface, (x + self.width, 0))
+        rects = []
+        for box in self.boxes:
+            # Depending on the offset a cloud shows through one copy of the strip or the other
+            for dx in (x, x + self.width):
+                rect = box.move(dx, 0).clip(SCREEN_RECT)
+                if rect.width:
+                    rects.append(rect)
+        return rects
+
+class Background:
+    def __init__(self, layers=()):
+        self.surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)).convert()
+        self.surface.fill(SKY_BLUE)
+        draw_mountains(self.surface)
+        self.layers = list(layers)
+
+    def update(self):
+        for layer in self.layers:
+            layer.update()
+
+    def offsets(self):
+        return [layer.offset for layer in self.layers]
+
+    # Blit the static part and every layer; returns the rects of the clouds drawn
+    def draw(self, surface, offsets):
+        surface.blit(self.surface, (0, 0))
+        rects = []
+        for layer, offset in zip(self.layers, offsets):
+            rects.extend(layer.draw(surface, offset))
+        return rects
+
+# Five clouds is the g8.py sky: one layer drifting a pixel per frame.
+# Denser skies are split over three layers, the farther ones greyer and slower.
+def default_background(clouds=5, seed=None):
+    rng = random.Random(seed)
+    layers = [(1, WHITE)] if clouds <= 5 else [(0.25, GREY), (0.5, LIGHT_GREY), (1, WHITE)]
+    count = max(1, clouds // len(layers))
+    return Background([ParallaxLayer([Cloud(rng) for _ in range(count)], speed, color) for speed, color in layers])
+
+# Renderer
+# Full mode updates the whole window every frame. Dirty mode remembers where
+# every moving thing was drawn and hands display.update() only those
+# rectangles from this frame and the last, which covers both the new
+# positions and the spots they moved away from.
+class Renderer:
+    def __init__(self, screen, background, dirty=False):
+        self.screen = screen
+        self.background = background
+        self.dirty = dirty
+        self.rects = []
+        self.last_rects = []
+        self.full_update = True
+
+    def draw_background(self, offsets):
+        for rect in self.background.draw(self.screen, offsets):
+            self.mark(rect)
+
+    def draw_bird(self, bird, y):
+        self.mark(draw_bird(self.screen, bird, y))
+
+    def draw_pylon(self, pylon, x):
+        self.mark(draw_pylon(self.screen, pylon, x))
+
+    def mark(self, rect):
+        if self.dirty and rect.width and rect.height:
+            self.rects.append(rect)
+
+    # Push the whole window on the next present (first frame, window exposed)
+    def invalidate(self):
+        self.full_update = True
+
+    # Things are drawn in the same order every frame, so each rect can be
+    # merged with the one it replaces; mostly they overlap by all but a few pixels
+    def changed_rects(self):
+        if len(self.rects) != len(self.last_rects):
+            rects = self.last_rects + self.rects
+        else:
+            rects = [old.union(new) for old, new in zip(self.last_rects, self.rects)]
+        # Overlapping clouds would be pushed twice; a pair whose bounding box
+        # is no bigger than the two apart goes as that box instead
+        merged = []
+        for rect in rects:
+            for i in reversed(rect.collidelistall(merged)):
+                other = merged[i]
+                union = rect.union(other)
+                if union.width * union.height <= rect.width * rect.height + other.width * other.height:
+                    rect = union
+                    del merged[i]
+            merged.append(rect)
+        return merged
+
+    def present(self):
+        if not self.dirty or self.full_update:
+            pygame.display.update()
+            self.full_update = False
+        else:
+            pygame.display.update(self.changed_rects())
+        self.last_rects, self.rects = self.rects, self.last_rects
+        self.rects.clear()
+
+# Benchmark: play a scripted game in both modes and compare frame cost
+def benchmark(screen, hud, frames, dirty, clouds=5):
+    renderer = Renderer(screen, default_background(clouds, seed=0), dirty)
+    seeds = random.Random(0)
+    state = sim.new_game(seeds.randrange(2**32))
+    pixels = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        pygame.event.pump()
+        state, event = sim.step(state, sim.follow_gap(state))
+        if event & sim.CRASH:
+            state = sim.new_game(seeds.randrange(2**32))
+        renderer.background.update()
+
+        renderer.draw_background(renderer.background.offsets())
+        renderer.draw_bird(state.bird, state.bird.y)
+        for pylon in state.pylons:
+            renderer.draw_pylon(pylon, pylon.x)
+        renderer.mark(hud.draw_score(screen, state.score, 0))
+        pixels += sum(rect.width * rect.height for rect in renderer.changed_rects())
+        renderer.present()
+    elapsed = time.perf_counter() - start
+    return elapsed / frames * 1000, pixels / frames / (SCREEN_WIDTH * SCREEN_HEIGHT)
+
+if __name__ == "__main__":
+    from hud import HUD
+
+    parser = argparse.ArgumentParser(
+        description="Compare full-window and dirty-rectangle presentation. "
+                    "Pick the SDL backend with SDL_VIDEODRIVER / SDL_FRAMEBUFFER_ACCELERATION=0 "
+                    "to measure software drivers.")
+    parser.add_argument("--frames", type=int, default=2_000)
+    parser.add_argument("--clouds", type=int, default=5)
+    args = parser.parse_args()
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    hud = HUD(pygame.font.SysFont(None, 24))
+    print(f"video driver: {pygame.display.get_driver()}")
+    for name, dirty in (("full", False), ("dirty", True)):
+        ms, coverage = benchmark(screen, hud, args.frames, dirty, args.clouds)
+        updated = "100%" if not dirty else f"{coverage:.0%}"
+        print(f"{name:<6} {ms:7.3f} ms/frame  rect area pushed per frame: {updated} of the window")
+    pygame.quit()
@@ -0,0 +1,130 @@
+# Input replays: a game is fully described by its seed and the frames on which
+# the player flapped. Frames are stored as varint-encoded gaps, which is one
+# byte per flap for normal play.
+import argparse
+import os
+import time
+
+import sim
+
+MAGIC = b"FBR1"
+
+# Unsigned LEB128 varints
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+# A recorded game: seed, flap frames and the result it ended with
+class Replay:
+    def __init__(self, seed, flaps=None, score=0, frames=0):
+        self.seed = seed
+        self.flaps = flaps if flaps is not None else []
+        self.score = score
+        self.frames = frames
+
+    def to_bytes(self):
+        out = bytearray(MAGIC)
+        for value in (self.seed, self.score, self.frames, len(self.flaps)):
+            write_varint(out, value)
+        last = 0
+        for frame in self.flaps:
+            write_varint(out, frame - last)
+            last = frame
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("not a Flappy Bird replay")
+        pos = len(MAGIC)
+        seed, pos = read_varint(data, pos)
+        score, pos = read_varint(data, pos)
+        frames, pos = read_varint(data, pos)
+        count, pos = read_varint(data, pos)
+        flaps = []
+        frame = 0
+        for _ in range(count):
+            gap, pos = read_varint(data, pos)
+            frame += gap
+            flaps.append(frame)
+        return cls(seed, flaps, score, frames)
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+# Records the flaps of one game as it is played
+class Recorder:
+    def __init__(self, state):
+        self.replay = Replay(state.seed)
+
+    # Call with the state *before* the step that applies the flap
+    def flap(self, state):
+        self.replay.flaps.append(state.frame)
+
+    def finish(self, state):
+        self.replay.score = state.score
+        self.replay.frames = state.frame
+        return self.replay
+
+# Re-simulate a replay headless, as fast as possible
+def play(replay, max_frames=None):
+    state = sim.new_game(replay.seed)
+    flaps = iter(replay.flaps)
+    next_flap = next(flaps, -1)
+    limit = max_frames if max_frames is not None else replay.frames
+    while not state.game_over and state.frame < limit:
+        flap = state.frame == next_flap
+        if flap:
+            next_flap = next(flaps, -1)
+        state, _ = sim.step(state, flap)
+    return state
+
+def verify(replay):
+    state = play(replay)
+    return state.score == replay.score and state.frame == replay.frames
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded Flappy Bird games headless")
+    parser.add_argument("paths", nargs="+", help="replay files or directories of them")
+    args = parser.parse_args()
+
+    paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            paths.extend(os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith(".fbr"))
+        else:
+            paths.append(path)
+
+    failed = 0
+    frames = 0
+    start = time.perf_counter()
+    for path in paths:
+        replay = Replay.load(path)
+        state = play(replay)
+        frames += state.frame
+        ok = state.score == replay.score and state.frame == replay.frames
+        failed += not ok
+        print(f"{path}: seed {replay.seed} score {state.score} frames {state.frame} "
+              f"{'ok' if ok else f'MISMATCH (recorded score {replay.score} frames {replay.frames})'}")
+    elapsed = time.perf_counter() - start
+    print(f"{len(paths)} replays, {frames} frames in {elapsed:.2f}s, {failed} mismatches")
+    raise SystemExit(1 if failed else 0)
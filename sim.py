@@ -0,0 +1,268 @@
+# Headless simulation core for the g8.py game rules.
+# No display, clock or mixer here: everything runs as fast as Python allows.
+import argparse
+import random
+import time
+
+import collision
+
+# Playfield
+SCREEN_WIDTH, SCREEN_HEIGHT = 400, 600
+
+# Step events (bit flags, a frame can both score and crash)
+SCORE = 1
+CRASH = 2
+
+# Where the three pylons start
+PYLON_START = (300, 600, 900)
+
+# Bird Class
+class Bird:
+    __slots__ = ("x", "y", "radius", "jumpSpeed", "gravity", "isJumping")
+
+    def __init__(self):
+        self.x = 50
+        self.radius = 15
+        self.gravity = 2
+        self.reset()
+
+    def reset(self):
+        self.y = 300
+        self.jumpSpeed = 10
+        self.isJumping = False
+
+    def jump(self):
+        self.isJumping = True
+        self.jumpSpeed = 10
+
+    def update(self):
+        if self.isJumping:
+            self.jumpSpeed -= 1
+            self.y -= self.jumpSpeed
+            if self.jumpSpeed < -10:
+                self.isJumping = False
+        else:
+            self.y += self.gravity
+
+# Pylon Class
+class Pylon:
+    __slots__ = ("x", "y", "width", "height", "gap", "speed")
+
+    def __init__(self):
+        self.width = 30
+        self.height = 300
+        self.place(0, 0)
+
+    def place(self, x, y, gap=200, speed=2):
+        self.x = x
+        self.y = y
+        self.gap = gap
+        self.speed = speed
+
+    # True once the pylon is off the left edge and the level should place it again
+    def update(self):
+        self.x -= self.speed
+        return self.x < -self.width
+
+    # Bird overlapping the pylon right now (no motion)
+    def collide(self, bird):
+        return collision.pylon_hit(self, self.x, bird, bird.y) is not None
+
+# Levels
+# A level places the three pylons at the start of a game and again each time
+# one scrolls off the left edge. ClassicLevel is the g8.py game: pylons come
+# back at the right edge with a gap offset from the game's own RNG.
+# level.CurveLevel generates levels that get harder.
+class ClassicLevel:
+    def start(self, state):
+        for pylon, x in zip(state.pylons, PYLON_START):
+            pylon.place(x, state.rng.randint(-150, 150))
+
+    def recycle(self, state, pylon):
+        pylon.place(SCREEN_WIDTH, state.rng.randint(-150, 150))
+
+CLASSIC = ClassicLevel()
+
+# Game State
+# Every game draws from its own RNG, so a seed plus the flap frames is
+# enough to replay it exactly (see replay.py).
+# A state owns its RNG, bird and pylons for life: reset() puts them back to
+# the start of a new game in place, so restarting a classic game doesn't allocate.
+class GameState:
+    __slots__ = ("seed", "rng", "level", "specs", "bird", "pylons",
+                 "score", "frame", "game_over", "death", "next_pylon")
+
+    def __init__(self, seed=None, level=None):
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng = random.Random(self.seed)
+        self.level = level or CLASSIC
+        self.specs = None  # Level's own per-game state
+        self.bird = Bird()
+        self.pylons = [Pylon(), Pylon(), Pylon()]
+        self.level.start(self)
+        self.start()
+
+    def reset(self, seed=None):
+        self.seed = seed if seed is not None else random.randrange(2**32)
+        self.rng.seed(self.seed)
+        self.bird.reset()
+        self.level.start(self)
+        self.start()
+        return self
+
+    def start(self):
+        self.score = 0
+        self.frame = 0
+        self.game_over = False
+        self.death = None  # "top" or "bottom" pylon once crashed
+        self.next_pylon = self.pylons[0]
+
+def new_game(seed=None, level=None):
+    return GameState(seed, level)
+
+# Advance one 60 Hz frame, same order as the g8.py loop.
+# Only the next pylon in scroll order can touch the bird, so it is the only
+# one tested for collisions and scoring. A profiler.FrameProfiler can be
+# passed in to time the bird and pylon stages.
+def step(state, flap, profiler=None):
+    if state.game_over:
+        return state, 0
+
+    bird = state.bird
+    target = state.next_pylon
+    prev_y = bird.y
+    prev_x = target.x
+    if flap:
+        bird.jump()
+    bird.update()
+    if profiler is not None:
+        profiler.lap("bird.update")
+    recycle = False
+    for pylon in state.pylons:
+        recycle |= pylon.update()
+    if recycle:
+        for pylon in state.pylons:
+            if pylon.x < -pylon.width:
+                state.level.recycle(state, pylon)
+
+    event = 0
+    death = collision.pylon_hit(target, prev_x, bird, prev_y)
+    if death:
+        state.game_over = True
+        state.death = death
+        event |= CRASH
+    if collision.crossed(prev_x, target, bird):
+        state.score += 1
+        event |= SCORE
+    if collision.passed(target, bird):
+        state.next_pylon = next_pylon(state)
+
+    state.frame += 1
+    if profiler is not None:
+        profiler.lap("pylons")
+    return state, event
+
+# Nearest pylon the bird hasn't got past yet
+def next_pylon(state):
+    bird = state.bird
+    nearest = None
+    for pylon in state.pylons:
+        if not collision.passed(pylon, bird) and (nearest is None or pylon.x < nearest.x):
+            nearest = pylon
+    return nearest
+
+# Simple policy: flap whenever the bird sinks below the middle of the next gap
+def follow_gap(state):
+    bird = state.bird
+    pylon = state.next_pylon
+    target = pylon.y + pylon.height + pylon.gap // 2
+    return bird.y > target + 20 and (not bird.isJumping or bird.jumpSpeed < 0)
+
+# Run games back to back with no frame cap
+def run_headless(frames, policy=follow_gap, seed=None, level=None):
+    seeds = random.Random(seed)
+    state = new_game(seeds.randrange(2**32), level)
+    games = 0
+    total_score = 0
+    best = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        state, event = step(state, policy(state))
+        if event & CRASH:
+            games += 1
+            total_score += state.score
+            best = max(best, state.score)
+            state.reset(seeds.randrange(2**32))
+    elapsed = time.perf_counter() - start
+    return {
+        "frames": frames,
+        "seconds": elapsed,
+        "fps": frames / elapsed if elapsed else float("inf"),
+        "games": games,
+        "mean_score": total_score / games if games else 0.0,
+        "best_score": best,
+    }
+
+# After a warm-up, a long run of frames and restarts must leave traced memory
+# where it started: nothing the frame loop does may hold on to memory.
+# CPython keeps freed tuples and small ints on free lists that tracemalloc
+# still counts, so a few dozen bytes can move either way between runs.
+# A step isn't allocation-free, it can't be in CPython: coordinates past the
+# small-int cache, the floats and tuples of the collision math and the call
+# frames are created and freed every frame. What is checked is that this
+# stays a few hundred bytes per frame (restarts included) and never grows.
+# This covers the rules only. g8.py's frame loop also builds the snapshot()
+# lists each step, the interpolated positions and pygame's Rects each frame;
+# bench.py reports its allocations per frame.
+ALLOC_SLACK = 256
+FRAME_PEAK_LIMIT = 1024  # Bytes alive at once within a single frame
+
+def check_allocations(frames=100_000, seed=0):
+    import tracemalloc
+
+    seeds = random.Random(seed)
+    state = new_game(seeds.randrange(2**32))
+
+    def run(frames, peaks=None):
+        for _ in range(frames):
+            if peaks is not None:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+            step(state, follow_gap(state))
+            if state.game_over:
+                state.reset(seeds.randrange(2**32))
+            if peaks is not None:
+                peaks[0] = max(peaks[0], tracemalloc.get_traced_memory()[1] - before)
+
+    tracemalloc.start()
+    run(frames // 10)  # Warm up the interpreter's caches and free lists
+    before = tracemalloc.get_traced_memory()[0]
+    run(frames)
+    retained = tracemalloc.get_traced_memory()[0] - before
+    peaks = [0]
+    run(frames // 10, peaks)
+    tracemalloc.stop()
+    return retained, peaks[0]
+
+def print_report(report):
+    print(f"{report['frames']} frames in {report['seconds']:.2f}s ({report['fps']:,.0f} fps)")
+    print(f"{report['games']} games, mean score {report['mean_score']:.2f}, best {report['best_score']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Flappy Bird rules headless")
+    parser.add_argument("--frames", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--difficulty", type=float, default=None,
+                        help="play level.CurveLevel games starting at this difficulty (0-1) instead of the classic game")
+    parser.add_argument("--check-alloc", action="store_true",
+                        help="fail if the frame loop holds on to memory or allocates more than a few objects per frame")
+    args = parser.parse_args()
+    if args.check_alloc:
+        retained, peak = check_allocations(args.frames, args.seed or 0)
+        print(f"retained after {args.frames} frames: {retained} bytes, largest transient allocation in a frame: {peak} bytes (limit {FRAME_PEAK_LIMIT})")
+        raise SystemExit(1 if retained > ALLOC_SLACK or peak > FRAME_PEAK_LIMIT else 0)
+    level = None
+    if args.difficulty is not None:
+        from level import CurveLevel  # Needs NumPy
+        level = CurveLevel(args.difficulty)
+    print_report(run_headless(args.frames, seed=args.seed, level=level))
@@ -0,0 +1,100 @@
+# Sound bank: decodes every effect once at startup, gives each one its own
+# reserved mixer channel and plays them by integer handle.
+import os
+import threading
+import time
+
+import pygame
+
+# Sounds ship next to the game scripts
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Effects used by g8.py
+EFFECTS = {
+    "tap": "tap.wav",
+    "game_over": "GO.wav",
+    "new_high_score": "nhs.wav",
+}
+
+class SoundBank:
+    def __init__(self):
+        self.names = []
+        self.sounds = []
+        self.channels = []
+        self.load_times = []
+        self.play_counts = []
+        self.play_totals = []
+        self.play_worst = []
+        self.ready = False
+        self.ready_at = None
+        self.thread = None
+
+    # Decode a batch of name -> file effects and reserve one channel each;
+    # returns the handles in the same order
+    def load_all(self, effects):
+        handles = [self.load(name, filename) for name, filename in effects.items()]
+        self.reserve_channels()
+        self.ready = True
+        self.ready_at = time.perf_counter()
+        return handles
+
+    # Same, but opens the mixer and decodes on a background thread so startup
+    # doesn't wait for the audio device or the WAV files. Handles are handed
+    # out right away; play() ignores them until loading is done.
+    def load_async(self, effects):
+        first = len(self.sounds)
+        self.thread = threading.Thread(target=self.load_in_background, args=(effects,), daemon=True)
+        self.thread.start()
+        return list(range(first, first + len(effects)))
+
+    def load_in_background(self, effects):
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            self.load_all(effects)
+        except pygame.error as error:
+            print(f"sound disabled: {error}")
+
+    # Block until background loading has finished
+    def wait(self):
+        if self.thread:
+            self.thread.join()
+
+    def load(self, name, filename):
+        start = time.perf_counter()
+        sound = pygame.mixer.Sound(os.path.join(ASSET_DIR, filename))
+        self.load_times.append(time.perf_counter() - start)
+        self.names.append(name)
+        self.sounds.append(sound)
+        self.play_counts.append(0)
+        self.play_totals.append(0.0)
+        self.play_worst.append(0.0)
+        return len(self.sounds) - 1
+
+    # Reserved channels are never handed out by Sound.play(), so one effect
+    # can't steal another's channel
+    def reserve_channels(self):
+        pygame.mixer.set_reserved(len(self.sounds))
+        self.channels = [pygame.mixer.Channel(i) for i in range(len(self.sounds))]
+
+    def play(self, handle):
+        if not self.ready:
+            return
+        start = time.perf_counter()
+        self.channels[handle].play(self.sounds[handle])
+        elapsed = time.perf_counter() - start
+        self.play_counts[handle] += 1
+        self.play_totals[handle] += elapsed
+        if elapsed > self.play_worst[handle]:
+            self.play_worst[handle] = elapsed
+
+    def report(self):
+        if not self.ready:
+            return "sound bank: not loaded"
+        lines = [f"sound bank: loaded {len(self.sounds)} effects in {sum(self.load_times) * 1000:.1f} ms"]
+        for i, name in enumerate(self.names):
+            count = self.play_counts[i]
+            mean = self.play_totals[i] / count * 1e6 if count else 0.0
+            lines.append(f"  {name:<16} load {self.load_times[i] * 1000:7.2f} ms  "
+                         f"plays {count:5}  mean {mean:7.1f} us  worst {self.play_worst[i] * 1e6:7.1f} us")
+        return "\n".join(lines)
@@ -0,0 +1,119 @@
+# Tournament runner: plays many episodes of the sim.py rules for several bot
+# policies, sharded across a process pool, and merges the results into one report.
+import argparse
+import importlib
+import json
+import os
+import random
+import statistics
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import sim
+
+# Death causes, stored as small ints in the result records
+CAUSES = ("top", "bottom", "timeout")
+
+# Policies
+def never_flap(state):
+    return False
+
+class RandomFlap:
+    def __init__(self, seed, rate=0.08):
+        self.rng = random.Random(seed)
+        self.rate = rate
+
+    def __call__(self, state):
+        return self.rng.random() < self.rate
+
+# name -> factory(seed) returning policy(state) -> flap
+POLICIES = {
+    "follow_gap": lambda seed: sim.follow_gap,
+    "never": lambda seed: never_flap,
+    "random": lambda seed: RandomFlap(seed),
+}
+
+# Built-in name, or "module:function" for a policy defined elsewhere
+def make_policy(name, seed):
+    if name in POLICIES:
+        return POLICIES[name](seed)
+    module, _, attr = name.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+# Every episode gets its own seed, so results don't depend on which worker ran it
+def episode_seed(seed, episode):
+    return seed * 2**32 + episode
+
+# Policies get a seed of their own. sim.new_game draws the pylons from
+# Random(game seed), so a policy seeded the same way would flap as a fixed
+# function of the level layout.
+def policy_seed(game_seed):
+    return f"policy-{game_seed}"
+
+# Play one episode; returns (score, frames survived, cause index)
+def play_episode(policy, seed, max_frames):
+    state = sim.new_game(seed)
+    while not state.game_over and state.frame < max_frames:
+        state, _ = sim.step(state, policy(state))
+    cause = CAUSES.index(state.death) if state.game_over else CAUSES.index("timeout")
+    return state.score, state.frame, cause
+
+# Worker: play a shard of episodes and send back a flat int array of records
+def run_shard(name, seed, first, count, max_frames):
+    records = array("i")
+    for episode in range(first, first + count):
+        game_seed = episode_seed(seed, episode)
+        records.extend(play_episode(make_policy(name, policy_seed(game_seed)), game_seed, max_frames))
+    return name, records
+
+def summarize(records):
+    scores = records[0::3]
+    frames = records[1::3]
+    causes = records[2::3]
+    return {
+        "episodes": len(scores),
+        "mean_score": statistics.fmean(scores),
+        "median_score": statistics.median(scores),
+        "best_score": max(scores),
+        "mean_frames": statistics.fmean(frames),
+        "deaths": {cause: causes.count(i) for i, cause in enumerate(CAUSES)},
+    }
+
+def run_tournament(policies, episodes, seed=0, workers=None, max_frames=100_000, shard_size=None):
+    workers = workers or os.cpu_count() or 1
+    shard_size = shard_size or max(1, episodes // (workers * 4))
+    results = {name: array("i") for name in policies}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_shard, name, seed, first, min(shard_size, episodes - first), max_frames)
+            for name in policies
+            for first in range(0, episodes, shard_size)
+        ]
+        for future in futures:
+            name, records = future.result()
+            results[name].extend(records)
+    return {name: summarize(records) for name, records in results.items()}
+
+def print_report(report):
+    print(f"{'policy':<20} {'episodes':>8} {'mean':>8} {'median':>8} {'best':>6} {'frames':>10}  deaths")
+    for name, row in sorted(report.items(), key=lambda item: -item[1]["mean_score"]):
+        deaths = " ".join(f"{cause}={count}" for cause, count in row["deaths"].items())
+        print(f"{name:<20} {row['episodes']:>8} {row['mean_score']:>8.2f} {row['median_score']:>8.1f} "
+              f"{row['best_score']:>6} {row['mean_frames']:>10.1f}  {deaths}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate Flappy Bird bot policies across all cores")
+    parser.add_argument("policies", nargs="*", default=["follow_gap", "random", "never"],
+                        help="built-in policy names or module:function")
+    parser.add_argument("--episodes", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-frames", type=int, default=100_000, help="end an episode as a timeout after this many frames")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = run_tournament(args.policies, args.episodes, args.seed, args.workers, args.max_frames)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)